@@ -449,88 +449,6 @@ class BusReader(BytesSource):
     def SetPropagationDelay(self, propagationDelay):
         self.propagationDelay = propagationDelay
         
-class Calibrator():
-    def __init__(self, reader, propagationDelayMin = 0, propagationDelayMax = 500):
-        self.reader = reader
-        self.propagationDelayMin = propagationDelayMin
-        self.propagationDelayMax = propagationDelayMax
-
-    def Calibrate(self, offset=0, blockSize=256, iterations=5, rounds=50):
-        propagationDelayMin = self.propagationDelayMin
-        propagationDelayMax = self.propagationDelayMax
-        canditatePropagationDelay = propagationDelayMax
-    
-        for rnd in range(0, rounds):
-
-            print("round:", rnd)
-            print("propagationDelay (max):", propagationDelayMax)
-            self.reader.SetPropagationDelay(propagationDelayMax)
-
-            errorCount = 0
-            lastHash = None
-            for index in range(0, iterations):
-                self.reader.Seek(offset)
-                hasher = hashlib.new("sha256")
-                data = self.reader.Read(blockSize)
-
-                hasher.update(data)
-                thisHash = hasher.hexdigest()
-                #print("last hash:" , lastHash)
-
-                if lastHash == None or thisHash != lastHash:
-                    print("hash:" , thisHash)
-
-                if lastHash != None and thisHash != lastHash:
-                    print("unstable at max")
-                    errorCount += 1
-                    break
-                
-                lastHash = thisHash
-
-            if errorCount > 0:
-                temp = propagationDelayMax
-                propagationDelayMax = propagationDelayMax + int((propagationDelayMax-propagationDelayMin)*1.15)
-                propagationDelayMin = temp
-                continue
-
-            canditatePropagationDelay = propagationDelayMax
-            
-            print("propagationDelay (min):", propagationDelayMin)
-
-            errorCount = 0
-            lastHash = None
-            self.reader.SetPropagationDelay(propagationDelayMin)
-            for index in range(0, iterations):
-                self.reader.Seek(offset)
-                hasher = hashlib.new("sha256")
-                data = self.reader.Read(blockSize)
-
-                hasher.update(data)
-                thisHash = hasher.hexdigest()
-                #print("last hash:" , lastHash)
-                if lastHash == None or thisHash != lastHash:
-                    print("hash:" , thisHash)
-
-                if lastHash != None and thisHash != lastHash:
-                    print("unstable at min")
-                    errorCount += 1
-                    break
-                
-                lastHash = thisHash
-                
-            if errorCount > 0:
-                propagationDelayMax = propagationDelayMin + int((propagationDelayMax-propagationDelayMin)*0.71)
-                #propagationDelayMin = int(propagationDelayMin + (propagationDelayMax - propagationDelayMin) / 7)
-            else:
-                canditatePropagationDelay = propagationDelayMin
-
-                if propagationDelayMax == propagationDelayMin:
-                   break
-                propagationDelayMax = propagationDelayMin
-                #break
-            
-        return canditatePropagationDelay
-  
 class BinFileDumper(BytesSink):
     def __init__(self, fileName):
         self.file = open(fileName,"wb")
@@ -612,10 +530,7 @@ busReader = BusReader(addressBus, dataBus)
 hexDumper = HexDumper(sys.stdout)
 hashingCollective = HashingCollective()
 
-# does not appear to make a difference, I don't think reading frequency is an issue
-#calibrator = Calibrator(busReader)
-#propagationDelay = 1 # calibrator.Calibrate(blockSize=BlockSize)
-#busReader.SetPropagationDelay(propagationDelay)
+# timing calibration now lives in lib/Calibrator.py
 
 busReader.Reset()
 
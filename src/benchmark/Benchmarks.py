@@ -0,0 +1,219 @@
+import sys
+import os
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.abspath('../lib'))
+sys.path.insert(0, os.path.abspath('../mock'))
+
+from Gpio import InputGpioBus, OutputGpioBus, CounterBasedAddressBus, ShiftRegisterAddressBus
+from SimulatedPromGpio import SimulatedPromGpio
+from BusReader import BusReader, Traversal
+from BytesReader import BytesReader
+from MultiSocketReader import MultiSocketReader
+from PromReader import PromReader
+from HexDumper import HexDumper
+from HashGenerator import HashingCollective
+from BinFileDumper import BinFileDumper
+from SplitAddressBus import SplitAddressBus
+from Settle import ParallelSettle, RippleSettle
+
+#
+# Constants
+#
+
+# Same wiring as the Pi harness, A0-A15 for a 27C512
+AddressPins = (10,9,11,25,8,7,5,6,12,13,19,16,20,21,26,4)
+DataPins = (17,27,22,18,2,3,23,24)
+
+Width = 16
+ClockPin = 14
+ResetPin = 15
+
+# 74HC595 chain serial data, shift clock and latch
+ShiftPins = (10,9,11)
+
+ChipSize = 1 << Width
+BlockSize = 1024
+
+# Split wiring: the low bits from the counter, the rest from the address pins
+SplitWidth = 8
+SeekCount = 32
+
+# Data pins of the extra sockets sharing the counter
+SocketDataPins = ((40,41,42,43,44,45,46,47), (48,49,50,51,52,53,54,55))
+
+# Simulated chip access time and counter stage delay, in ns
+AccessTime = 2000
+StageDelay = 250
+
+def MakeImage(size, seed = 512):
+    return random.Random(seed).randbytes(size)
+
+def MakeGpioReader(hal, traversal = Traversal.LINEAR):
+    return BusReader(OutputGpioBus(hal, AddressPins), InputGpioBus(hal, DataPins), traversal)
+
+def MakeCounterReader(hal):
+    return BusReader(CounterBasedAddressBus(hal, Width, 0, ResetPin, ClockPin), InputGpioBus(hal, DataPins))
+
+def MakeRippleSettleReader(hal):
+    reader = MakeCounterReader(hal)
+    reader.SetSettle(RippleSettle(AccessTime, StageDelay))
+    return reader
+
+def MakeWorstCaseSettleReader(hal):
+    reader = MakeCounterReader(hal)
+    reader.SetSettle(ParallelSettle(AccessTime + Width * StageDelay))
+    return reader
+
+def MakeShiftReader(hal):
+    return BusReader(ShiftRegisterAddressBus(hal, Width, *ShiftPins), InputGpioBus(hal, DataPins))
+
+def MakeSplitReader(hal):
+    counterBus = CounterBasedAddressBus(hal, SplitWidth, 0, ResetPin, ClockPin)
+    highBus = OutputGpioBus(hal, AddressPins[SplitWidth:])
+    return BusReader(SplitAddressBus(counterBus, highBus), InputGpioBus(hal, DataPins))
+
+def Report(name, hal, size, elapsed, valid = None):
+    if valid == None:
+        status = "-"
+    else:
+        status = "ok" if valid else "MISMATCH"
+    print("{:<28} {:>10.0f} B/s {:>8.2f} calls/B  {}".format(name, size / elapsed, hal.GetCallCount() / size, status))
+
+def BenchBusReader(name, image, makeHal, makeReader):
+    hal = makeHal(image)
+    with makeReader(hal) as reader:
+        hal.ResetCallCount()
+        start = time.perf_counter()
+        data = reader.Read(len(image))
+        elapsed = time.perf_counter() - start
+
+    Report(name, hal, len(image), elapsed, data == image)
+
+def BenchSeeks(name, image, makeHal, makeReader):
+    hal = makeHal(image)
+    targets = random.Random(SeekCount).sample(range(0, len(image)), SeekCount)
+    valid = True
+    with makeReader(hal) as reader:
+        hal.ResetCallCount()
+        start = time.perf_counter()
+        for target in targets:
+            reader.Seek(target)
+            valid = valid and reader.Read(1)[0] == image[target]
+        elapsed = time.perf_counter() - start
+
+    Report(name, hal, SeekCount, elapsed, valid)
+
+def BenchMultiSocket(name, image, portIo):
+    # Bytes per second over all sockets, every socket holding its own image
+    images = [image] + [MakeImage(len(image), seed) for seed in range(0, len(SocketDataPins))]
+    hal = SimulatedPromGpio(images[0], DataPins, resetPin=ResetPin, clockPin=ClockPin, counterWidth=Width, portIo=portIo)
+    dataBuses = [InputGpioBus(hal, DataPins)]
+    for socketImage, dataPins in zip(images[1:], SocketDataPins):
+        hal.AddSocket(socketImage, dataPins)
+        dataBuses.append(InputGpioBus(hal, dataPins))
+
+    with MultiSocketReader(CounterBasedAddressBus(hal, Width, 0, ResetPin, ClockPin), dataBuses) as reader:
+        hal.ResetCallCount()
+        start = time.perf_counter()
+        reader.Read(len(image))
+        elapsed = time.perf_counter() - start
+        valid = all(reader.GetImage(socket) == images[socket] for socket in range(0, len(images)))
+
+    Report(name, hal, len(image) * len(images), elapsed, valid)
+
+def BenchBytesReader(name, image, makeHal, makeReader, pipelineDepth = 0):
+    hal = makeHal(image)
+    hashes = HashingCollective()
+    reference = HashingCollective()
+    reference.Write(image)
+
+    path = os.path.join(tempfile.mkdtemp(), "image.bin")
+    binDumper = BinFileDumper(path)
+    with open(os.devnull, "w") as devnull:
+        with makeReader(hal) as source, BytesReader(source, BlockSize, pipelineDepth) as reader, HexDumper(devnull) as hexDumper:
+            reader.AddSink(hexDumper)
+            reader.AddSink(hashes)
+            reader.AddSink(binDumper)
+
+            hal.ResetCallCount()
+            start = time.perf_counter()
+            reader.Read(len(image))
+            reader.Flush()
+            elapsed = time.perf_counter() - start
+            valid = str(hashes) == str(reference)
+    binDumper.Close()
+    with open(path, "rb") as file:
+        valid = valid and file.read() == image
+    os.remove(path)
+
+    Report(name, hal, len(image), elapsed, valid)
+
+def BenchPromReader(name, image, makeHal, makeReader, pipelineDepth = 0):
+    hal = makeHal(image)
+    stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            with makeReader(hal) as source, PromReader(source, pipelineDepth=pipelineDepth) as reader:
+                hal.ResetCallCount()
+                start = time.perf_counter()
+                reader.Read(0)
+                elapsed = time.perf_counter() - start
+        finally:
+            sys.stdout = stdout
+
+    Report(name, hal, len(image), elapsed)
+
+def main():
+    image = MakeImage(ChipSize)
+
+    def portHal(image):
+        return SimulatedPromGpio(image, DataPins, AddressPins)
+
+    def pinHal(image):
+        return SimulatedPromGpio(image, DataPins, AddressPins, portIo=False)
+
+    def counterHal(image):
+        return SimulatedPromGpio(image, DataPins, resetPin=ResetPin, clockPin=ClockPin, counterWidth=Width)
+
+    def splitHal(image):
+        return SimulatedPromGpio(image, DataPins, AddressPins[SplitWidth:], ResetPin, ClockPin, SplitWidth)
+
+    def slowCounterHal(image):
+        return SimulatedPromGpio(image, DataPins, resetPin=ResetPin, clockPin=ClockPin, counterWidth=Width, accessTime=AccessTime)
+
+    def shiftHal(image):
+        return SimulatedPromGpio(image, DataPins, counterWidth=Width, shiftPins=ShiftPins)
+
+    def pinShiftHal(image):
+        return SimulatedPromGpio(image, DataPins, counterWidth=Width, shiftPins=ShiftPins, portIo=False)
+
+    def grayReader(hal):
+        return MakeGpioReader(hal, Traversal.GRAY)
+
+    print("27C512 image, {} bytes".format(len(image)))
+    BenchBusReader("BusReader gpio port", image, portHal, MakeGpioReader)
+    BenchBusReader("BusReader gpio per-pin", image, pinHal, MakeGpioReader)
+    BenchBusReader("BusReader gpio gray", image, portHal, grayReader)
+    BenchBusReader("BusReader counter", image, counterHal, MakeCounterReader)
+    BenchBusReader("BusReader ripple settle", image, slowCounterHal, MakeRippleSettleReader)
+    BenchBusReader("BusReader worst-case settle", image, slowCounterHal, MakeWorstCaseSettleReader)
+    BenchBusReader("BusReader split", image, splitHal, MakeSplitReader)
+    BenchBusReader("BusReader shift register", image, shiftHal, MakeShiftReader)
+    BenchBusReader("BusReader shift per-pin", image, pinShiftHal, MakeShiftReader)
+    BenchSeeks("random seeks gpio", image, portHal, MakeGpioReader)
+    BenchSeeks("random seeks counter", image, counterHal, MakeCounterReader)
+    BenchSeeks("random seeks split", image, splitHal, MakeSplitReader)
+    BenchSeeks("random seeks shift register", image, shiftHal, MakeShiftReader)
+    BenchMultiSocket("multi-socket x3 counter", image, True)
+    BenchMultiSocket("multi-socket x3 per-pin", image, False)
+    BenchBytesReader("BytesReader + sinks", image, portHal, MakeGpioReader)
+    BenchBytesReader("BytesReader + pipelined sinks", image, portHal, MakeGpioReader, pipelineDepth=16)
+    BenchPromReader("PromReader", image, portHal, MakeGpioReader)
+    BenchPromReader("PromReader pipelined", image, portHal, MakeGpioReader, pipelineDepth=256)
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,21 @@
 import sys
 import os
 
-from Reader import BytesSink
+from BytesReader import BytesSink
 
 class BinFileDumper(BytesSink):
     def __init__(self, fileName):
         self.file = open(fileName,"wb")
 
+    # Readers reset their sinks when disposed, so this keeps what has been
+    # written; Truncate starts the file over
+    def Reset(self):
+        self.file.flush()
+
+    def Truncate(self):
+        self.file.seek(0)
+        self.file.truncate()
+
     def Seek(self, offset=0):
         self.file.seek(offset)
         
@@ -3,26 +3,33 @@
 import sys
 import os
 
+from enum import Enum
+
 from Core import Disposable
-from Reader import BytesSource
+from BytesReader import BytesSource
+from Settle import SettleModel
+from Timing import Timing, SpinTiming
 import Hardware as hw
 
-class BusReader(BytesSource, Disposable):
-    def __init__(self, addressBus : hw.OutputBus, dataBus: hw.InputBus):
-        super(BusReader, self).__init__()
+class Traversal(Enum):
+    LINEAR = 0
+    GRAY = 1
+
+class BusReaderBase(Disposable):
+    # Presents addresses on an address bus, settling each one according to
+    # the settle model, for readers that sample data buses at them
+    def __init__(self, addressBus : hw.OutputBus, settle : SettleModel = None, timing : Timing = None):
+        super().__init__()
         self._addressBus = addressBus
-        self._dataBus = dataBus
         self._upperBound = 2 ** self._addressBus.width
-        self.Reset()
-    
-    def _OnDispose(self):
-        self.Reset()
+        self._timing = None
+        self.SetSettle(settle, timing)
 
-    def Reset(self):
+    def _resetAddress(self):
         self._addressBus.Reset()
-        self._dataBus.Reset()
         self._offset = 0
-        
+        self._address = None
+
     def Seek(self, offset, whence = os.SEEK_SET):
         if whence == os.SEEK_SET:
                 self._offset = offset
@@ -31,29 +38,116 @@ class BusReader(BytesSource, Disposable):
         elif whence == os.SEEK_END:
                 self._offset = self._upperBound - offset
 
+        # Settling is left to the read that follows, measured from the
+        # last address actually read
         self._addressBus.Write(self._offset)
-        
+
+    def GetAddressBus(self):
+        return self._addressBus
+
+    def SetSettle(self, settle : SettleModel, timing : Timing = None):
+        # Settle delays are short so spin by default
+        self._settle = settle
+        if timing != None:
+            self._timing = timing
+        elif settle != None and self._timing == None:
+            self._timing = SpinTiming()
+
+    def GetSettle(self):
+        return self._settle
+
+    def GetIsEOF(self):
+        return self._offset >= self._upperBound
+
+    def _remaining(self, size):
+        return max(0, min(self._upperBound - self._offset, size))
+
+    def _present(self, address, advance = False):
+        # Puts the address on the bus, by stepping from the previous one
+        # when advance is set, and waits for it to settle
+        if advance:
+            self._addressBus.Advance()
+        else:
+            self._addressBus.Write(address)
+
+        if self._settle != None:
+            self._settleFrom(self._address, address)
+        self._address = address
+
+    def _settleFrom(self, previous, address):
+        if previous == None:
+            # Unknown bus state, assume every line moved
+            previous = ~address & (self._upperBound - 1)
+
+        delay = self._settle.GetDelay(previous, address)
+        if delay > 0:
+            self._timing.Wait(delay)
+
+class BusReader(BusReaderBase, BytesSource):
+    def __init__(self, addressBus : hw.OutputBus, dataBus: hw.InputBus, traversal : Traversal = Traversal.LINEAR,
+                 settle : SettleModel = None, timing : Timing = None):
+        super(BusReader, self).__init__(addressBus, settle, timing)
+        self._dataBus = dataBus
+        self._traversal = traversal
+        self.Reset()
+    
+    def _OnDispose(self):
+        self.Reset()
+
+    def Reset(self):
+        self._resetAddress()
+        self._dataBus.Reset()
+
+    def GetDataBus(self):
+        return self._dataBus
+
+    def SetTraversal(self, traversal : Traversal):
+        self._traversal = traversal
+
     def Read(self, size):
-        buffer = bytearray()
-       
-        span = self._upperBound - self._offset
-        count = min(span, size)
-        
-        for index in range (0,count):
-            self._addressBus.Write(self._offset)
+        count = self._remaining(size)
+        buffer = bytearray(count)
+        self.ReadInto(buffer)
+        return buffer
 
-            # TODO: propagation delay
+    def ReadInto(self, buffer):
+        view = memoryview(buffer)
+        count = self._remaining(len(view))
 
-            data = self._dataBus.Read()
+        if self._traversal == Traversal.GRAY:
+            self._readGray(view, count)
+            return count
 
-            buffer.append(data)
+        for index in range (0,count):
+            self._present(self._offset, index > 0)
+            view[index] = self._dataBus.Read()
 
             self._offset += 1
             
-        return buffer
+        return count
+
+    def _readGray(self, view, count):
+        # Visit the range as aligned power-of-two chunks, each walked in
+        # Gray-code order so only one address line changes per step, and
+        # place every byte at its linear position in the buffer
+        start = self._offset
+        end = start + count
+
+        address = start
+        while address < end:
+            chunk = address & -address if address else self._upperBound
+            while address + chunk > end:
+                chunk >>= 1
+
+            for index in range(0, chunk):
+                target = address + (index ^ (index >> 1))
+                self._present(target)
+                view[target - start] = self._dataBus.Read()
+
+            address += chunk
+
+        self._offset = end
 
     def Close(self):
         self.Reset()
     
-    def GetIsEOF(self):
-        return self._offset >= self._upperBound
@@ -6,6 +6,7 @@ from abc import ABC, abstractmethod
 
 from Core import Disposable
 from Ux import ProgressReporter
+from SinkPipeline import SinkPipeline
 
 class BytesSink(ABC):
     @abstractmethod    
@@ -36,6 +37,14 @@ class BytesSource(ABC):
     def Read(self, size):
         pass
 
+    # Fills a caller-provided buffer and returns the number of bytes read;
+    # sources override this to avoid the intermediate copy
+    def ReadInto(self, buffer):
+        data = self.Read(len(buffer))
+        count = len(data)
+        buffer[:count] = data
+        return count
+
     @abstractmethod    
     def GetIsEOF(self):
         pass
@@ -45,57 +54,106 @@ class BytesSource(ABC):
         return self.GetIsEOF()
 
 class BytesReader(Disposable):
-    def __init__(self, source : BytesSource, blockSize):
+    # A pipelineDepth above zero hands sinks to worker threads fed through
+    # queues of that many blocks, see SinkPipeline
+    def __init__(self, source : BytesSource, blockSize, pipelineDepth = 0):
         super().__init__()
         self._source = source
         self._blockSize = blockSize
         self._sinks = []
+        self._terminators = []
+        self._terminated = False
         self._reporter = None
+        self._pipeline = None
+        if pipelineDepth > 0:
+            self._pipeline = SinkPipeline(pipelineDepth)
         self.Reset()
 
     def _OnDispose(self):
-        self.Reset()
+        try:
+            self.Reset()
+        finally:
+            if self._pipeline:
+                self._pipeline.Close()
 
     def AddSink(self, sink : BytesSink):
         self._sinks.append(sink)
+        if self._pipeline:
+            self._pipeline.AddSink(sink)
+
+    # A terminator is a sink fed each block as soon as it is read, even
+    # when the other sinks are pipelined; the read stops once its GetIsDone
+    # returns True
+    def AddTerminator(self, terminator : BytesSink):
+        self._terminators.append(terminator)
 
     def AddProgressReporter(self, reporter : ProgressReporter):
         self._reporter = reporter
 
+    def Flush(self):
+        # Waits until the sinks have seen every block read so far
+        if self._pipeline:
+            self._pipeline.Flush()
+
+    # Also discards an error left by a pipelined sink, which is then fed
+    # again
     def Reset(self):
         self._source.Reset()
-        for sink in self._sinks:
+        if self._pipeline:
+            self._pipeline.Reset()
+        self._terminated = False
+        for sink in self._sinks + self._terminators:
             sink.Reset()
         
     def Seek(self, offset, whence = os.SEEK_SET):
         self._source.Seek(offset, whence)
         
     def Read(self, size):
+        buffer = bytearray(size)
+        count = self.ReadInto(buffer)
+        if count < size:
+            return buffer[:count]
+        return buffer
+
+    def ReadInto(self, buffer):
+        # Sinks are handed memoryview slices of the caller's buffer, which
+        # are only valid for the duration of the Write call; pipelined
+        # sinks get copies instead
+        view = memoryview(buffer)
+        size = len(view)
         progress = 0
-        progressIncrement = (100 * size) / self._blockSize
-
-        data = []
-        while size > 0:
-            count = min(size, self._blockSize)
-            block = self._source.Read(count)
-            data += block
-
-            for sink in self._sinks:
-                sink.Write(block)
+        progressIncrement = (100 * self._blockSize) / size if size > 0 else 0
+
+        position = 0
+        while position < size:
+            count = min(size - position, self._blockSize)
+            block = view[position:position + count]
+            count = self._source.ReadInto(block)
+            block = block[:count]
+
+            if self._pipeline:
+                self._pipeline.Dispatch(block)
+            else:
+                for sink in self._sinks:
+                    sink.Write(block)
             
             if self._reporter:
                 self._reporter.Progress(progress)
                 progress += progressIncrement
 
-            if self._source.eof:
-                break
+            position += count
 
-            size -= count
+            for terminator in self._terminators:
+                terminator.Write(block)
+                self._terminated = self._terminated or terminator.GetIsDone()
+
+            if self.eof or count == 0:
+                break
 
-        return data
+        return position
 
     def GetIsEOF(self):
-        return self._source.eof
+        return self._terminated or self._source.eof
 
     @property
     def eof(self):
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import os
+import math
+import random
+
+from BytesReader import BytesSource
+from Settle import ParallelSettle
+
+class CalibrationResult():
+    def __init__(self, frequency, settleDelay, reads, errorBound):
+        self.frequency = frequency
+        self.settleDelay = settleDelay
+        # Clean block reads behind each accepted setting, and the upper
+        # bound on the per-read error rate they give at the confidence level
+        self.reads = reads
+        self.errorBound = errorBound
+
+    def __str__(self):
+        return f'frequency: {self.frequency} Hz, settle: {self.settleDelay} ns, {self.reads} reads, error rate < {self.errorBound:.3%}'
+
+class Calibrator():
+    # Searches for the fastest timing that reads stably. Blocks sampled
+    # from across the address space are read at a known-safe setting for
+    # reference; a candidate setting is accepted once enough clean re-reads
+    # bound its error rate below maxErrorRate with the given confidence.
+    def __init__(self, source : BytesSource, upperBound, blockSize = 256, sampleBlocks = 8,
+                 confidence = 0.95, maxErrorRate = 0.05, margin = 0.1, seed = 0):
+        self._source = source
+        self._blockSize = blockSize
+        self._confidence = confidence
+        self._margin = margin
+        self._reads = math.ceil(math.log(1 - confidence) / math.log(1 - maxErrorRate))
+        self._offsets = self._sampleOffsets(upperBound, blockSize, sampleBlocks, random.Random(seed))
+        self._references = None
+
+    def GetSampleOffsets(self):
+        return self._offsets
+
+    def Calibrate(self, addressBus, reader, minFrequency, maxFrequency, maxSettleDelay, minSettleDelay = 0):
+        # Push the clock with the longest settle, then trim the settle at
+        # that clock; the low phase of each pulse counts towards settling
+        reader.SetSettle(ParallelSettle(maxSettleDelay))
+        frequency = self.CalibrateFrequency(addressBus, minFrequency, maxFrequency)
+        settleDelay = self.CalibrateSettle(reader, maxSettleDelay, minSettleDelay)
+
+        return CalibrationResult(frequency, settleDelay, self._reads, self.GetErrorBound())
+
+    def CalibrateFrequency(self, addressBus, minimum, maximum, resolution = 0.05):
+        # Bisect in log space, resolution being relative
+        def apply(frequency):
+            addressBus.SetFrequency(frequency)
+
+        def refine(good, bad):
+            return math.sqrt(good * bad) if bad / good > 1 + resolution else None
+
+        frequency = self._search(apply, minimum, maximum, refine)
+        if frequency == maximum:
+            return frequency
+
+        return self._confirm(apply, max(minimum, frequency * (1 - self._margin)), minimum)
+
+    def CalibrateSettle(self, reader, maximum, minimum = 0, resolution = 100, model = ParallelSettle):
+        # model builds a SettleModel from a single delay in ns
+        def apply(delay):
+            reader.SetSettle(model(delay) if delay > 0 else None)
+
+        def refine(good, bad):
+            return (good + bad) // 2 if good - bad > resolution else None
+
+        delay = self._search(apply, maximum, minimum, refine)
+        if delay == minimum:
+            return delay
+
+        return self._confirm(apply, min(maximum, int(delay * (1 + self._margin))), maximum)
+
+    def GetErrorBound(self):
+        return 1 - (1 - self._confidence) ** (1 / self._reads)
+
+    def _search(self, apply, safe, fast, refine):
+        apply(safe)
+        self._references = self._readReferences()
+
+        apply(fast)
+        if self._isStable():
+            return fast
+
+        good = safe
+        bad = fast
+        candidate = refine(good, bad)
+        while candidate != None:
+            apply(candidate)
+            if self._isStable():
+                good = candidate
+            else:
+                bad = candidate
+            candidate = refine(good, bad)
+
+        return good
+
+    def _confirm(self, apply, value, safe):
+        # The setting backed off by the margin must still read cleanly
+        apply(value)
+        if not self._isStable():
+            value = safe
+            apply(value)
+
+        return value
+
+    def _readReferences(self):
+        references = []
+        for offset in self._offsets:
+            first = self._readBlock(offset)
+            if self._readBlock(offset) != first:
+                raise RuntimeError(f'reads at {offset:#x} are unstable at the safe setting')
+            references.append(first)
+
+        return references
+
+    def _isStable(self):
+        reads = 0
+        while reads < self._reads:
+            for offset, reference in zip(self._offsets, self._references):
+                if self._readBlock(offset) != reference:
+                    return False
+                reads += 1
+
+        return True
+
+    def _readBlock(self, offset):
+        self._source.Seek(offset, os.SEEK_SET)
+        return bytes(self._source.Read(self._blockSize))
+
+    def _sampleOffsets(self, upperBound, blockSize, sampleBlocks, rng):
+        # One block from each of sampleBlocks equal strata of the space
+        blocks = max(1, upperBound // blockSize)
+        sampleBlocks = min(sampleBlocks, blocks)
+        offsets = []
+        for stratum in range(0, sampleBlocks):
+            first = stratum * blocks // sampleBlocks
+            last = (stratum + 1) * blocks // sampleBlocks
+            offsets.append(rng.randrange(first, last) * blockSize)
+
+        return offsets
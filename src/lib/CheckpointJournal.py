@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import binascii
+
+from BytesReader import BytesSink
+from TimingProfileCache import TimingProfileCache
+
+class CheckpointJournal(BytesSink):
+    # Records a read as it happens so an interrupted one can carry on where
+    # it stopped. Bytes go straight into the image file at their offset;
+    # every interval bytes the file is synced and a small metadata file
+    # beside it is replaced atomically with the length read so far and its
+    # crc32. Reads are sequential, so the completed ranges are always one
+    # prefix of the image.
+    #
+    # hashlib state cannot be saved, so running hashes are rebuilt on
+    # resume by replaying the journaled prefix from disk, which is far
+    # quicker than reading it again over the bus.
+    #
+    # The identity names the part being read, see DescribePart, and a
+    # journal is only resumed by a read of the same part. Reset starts the
+    # journal over in memory; what is on disk is left until the next
+    # checkpoint, so the owner of the reader commits an interrupted read
+    # with Checkpoint before disposing of it. Discard wipes the file too.
+    def __init__(self, path, identity, interval = 16384):
+        if not identity:
+            raise ValueError('a journal needs the identity of the part it records')
+        self._path = path
+        self._metadataPath = path + '.journal'
+        self._interval = interval
+        self._identity = identity
+
+        resume = self._load()
+        self._file = open(path, "r+b" if os.path.exists(path) else "w+b")
+        if resume == None:
+            self._file.truncate()
+            self._position = 0
+            self._crc32 = 0
+        else:
+            self._position, self._crc32 = resume
+        self._checkpoint = self._position
+
+    @staticmethod
+    def DescribePart(chip, size, wiring):
+        # An identity for a chip type of a given size read over this wiring
+        return f'{chip}/{size}/{TimingProfileCache.GetFingerprint(wiring)}'
+
+    def GetPosition(self):
+        return self._position
+
+    def Reset(self):
+        self._position = 0
+        self._crc32 = 0
+        self._checkpoint = 0
+
+    def Write(self, data):
+        self._file.seek(self._position)
+        self._file.write(data)
+        self._position += len(data)
+        self._crc32 = binascii.crc32(data, self._crc32)
+
+        if self._position - self._checkpoint >= self._interval:
+            self.Checkpoint()
+
+    def Checkpoint(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        metadata = {
+            'identity': self._identity,
+            'completed': self._position,
+            'crc32': self._crc32
+            }
+        temporary = self._metadataPath + '.tmp'
+        with open(temporary, "w") as file:
+            json.dump(metadata, file, indent=2, sort_keys=True)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self._metadataPath)
+        self._checkpoint = self._position
+
+    def Replay(self, sink : BytesSink, blockSize = 65536):
+        # Feeds the journaled bytes to the sink in order
+        self._file.flush()
+        self._file.seek(0)
+        remaining = self._position
+        while remaining > 0:
+            block = self._file.read(min(blockSize, remaining))
+            if len(block) == 0:
+                raise IOError(f'{self._path} is shorter than its journal')
+            sink.Write(block)
+            remaining -= len(block)
+
+    def Discard(self):
+        self._file.seek(0)
+        self._file.truncate()
+        self._position = 0
+        self._crc32 = 0
+        self.Checkpoint()
+
+    def Close(self):
+        # Only bytes written since the last checkpoint or reset are
+        # committed, so closing a journal that was reset keeps the
+        # checkpoint on disk
+        if self._position != self._checkpoint:
+            self.Checkpoint()
+        self._file.close()
+
+    def _load(self):
+        # The journal is only trusted if it is for the same part and the
+        # image prefix it covers still has the recorded crc32
+        if not os.path.exists(self._metadataPath) or not os.path.exists(self._path):
+            return None
+
+        try:
+            with open(self._metadataPath, "r") as file:
+                metadata = json.load(file)
+        except ValueError:
+            return None
+
+        if metadata.get('identity') != self._identity:
+            return None
+
+        completed = metadata['completed']
+        crc32 = 0
+        with open(self._path, "rb") as file:
+            remaining = completed
+            while remaining > 0:
+                block = file.read(min(65536, remaining))
+                if len(block) == 0:
+                    return None
+                crc32 = binascii.crc32(block, crc32)
+                remaining -= len(block)
+
+        if crc32 != metadata['crc32']:
+            return None
+
+        return completed, crc32
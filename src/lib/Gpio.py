@@ -9,6 +9,8 @@ from abc import ABC, abstractmethod
 
 from Core import Disposable
 from Hardware import InputBus, OutputBus
+from Timing import Timing, HybridTiming
+from SeekPlanner import SeekPlanner, SeekCostModel, SeekMethod
 
 class Direction(Enum):
     INPUT = 1
@@ -32,12 +34,32 @@ class Gpio(ABC):
     def WriteGpio(self, pin, state : State):
         pass
 
+    # Port-level access; masks are indexed by pin number (bit n = pin n)
+
+    def GetSupportsPortIo(self):
+        return False
+
+    def ReadGpioPort(self):
+        raise NotImplementedError
+
+    def SetGpioMask(self, mask):
+        raise NotImplementedError
+
+    def ClearGpioMask(self, mask):
+        raise NotImplementedError
+
+    @property
+    def supportsPortIo(self):
+        return self.GetSupportsPortIo()
+
 class GpioBusBase(ABC):
     def __init__(self, hal, pins, dir : Direction):
         self._hal = hal
         self._width = len(pins)
         self._upperbound = 2 ** self._width
         self._pins = pins
+        self._pinMasks = tuple(1 << pin for pin in pins)
+        self._portIo = hal.supportsPortIo
         self._setDirection(dir)
        
     def GetWidth(self):
@@ -46,6 +68,9 @@ class GpioBusBase(ABC):
     def GetUpperbound(self):
         return self._upperbound
 
+    def GetWiring(self):
+        return { 'type': type(self).__name__, 'pins': list(self._pins) }
+
     def _setDirection(self, dir : Direction):
         hal = self._hal
         for pin in self._pins: 
@@ -62,10 +87,16 @@ class InputGpioBus(InputBus, GpioBusBase):
     def GetUpperbound(self):
         return GpioBusBase.GetUpperbound(self)
 
+    def GetWiring(self):
+        return GpioBusBase.GetWiring(self)
+
     def Reset(self):
         pass
         
     def Read(self):
+        if self._portIo:
+            return self._gather(self._hal.ReadGpioPort())
+
         bitValue=1
         data = 0
         for bitCounter in range (0, self.width):
@@ -74,7 +105,27 @@ class InputGpioBus(InputBus, GpioBusBase):
             bitValue=(bitValue<<1)    
         
         return data
+
+    # The HAL whose ReadGpioPort snapshots Decode understands, or None
+    # without port I/O
+    def GetPortHal(self):
+        return self._hal if self._portIo else None
+
+    # Extracts this bus's value from a port snapshot, so buses on one HAL
+    # can share a single ReadGpioPort
+    def Decode(self, levels):
+        return self._gather(levels)
         
+    def _gather(self, levels):
+        data = 0
+        bitValue = 1
+        for pinMask in self._pinMasks:
+            if levels & pinMask:
+                data |= bitValue
+            bitValue <<= 1
+
+        return data
+
     def _readBit(self, bit):
         pin = self._pins[bit]
         return self._hal.ReadGpio(pin)
@@ -82,6 +133,7 @@ class InputGpioBus(InputBus, GpioBusBase):
 class OutputGpioBus(OutputBus, GpioBusBase, Disposable):
     def __init__(self, hal, pins):
         super().__init__(hal, pins, Direction.OUTPUT)
+        self._scatterTables = self._buildScatterTables()
         self.Reset()
     
     def _OnDispose(self):
@@ -93,11 +145,29 @@ class OutputGpioBus(OutputBus, GpioBusBase, Disposable):
     def GetUpperbound(self):
         return GpioBusBase.GetUpperbound(self)
 
+    def GetWiring(self):
+        return GpioBusBase.GetWiring(self)
+
     def Reset(self):
         self._dataLast = None
         self.Write(0)
+
+    def GetWriteCost(self, data):
+        if self._dataLast == None:
+            changed = self._upperbound - 1
+        else:
+            changed = (data ^ self._dataLast) & (self._upperbound - 1)
+
+        if self._portIo:
+            return (1 if data & changed else 0) + (1 if changed & ~data else 0)
+
+        return bin(changed).count('1')
         
     def Write(self, data):
+        if self._portIo:
+            self._writePort(data)
+            return
+
         bitMask=1
         for bitCounter in range (0,self._width):
             maskedState = data & bitMask
@@ -113,28 +183,97 @@ class OutputGpioBus(OutputBus, GpioBusBase, Disposable):
             bitMask=(bitMask<<1)
 
         self._dataLast = data
+
+    def Advance(self):
+        data = (self._dataLast + 1) & (self._upperbound - 1)
+        if self._portIo:
+            self._writePort(data)
+            return
+
+        # Only the carry run changes
+        changed = data ^ self._dataLast
+        bitCounter = 0
+        while changed:
+            if changed & 1:
+                self._writeBit(bitCounter, State.HIGH if data & (1 << bitCounter) else State.LOW)
+            changed >>= 1
+            bitCounter += 1
+
+        self._dataLast = data
+
+    def _writePort(self, data):
+        data &= self._upperbound - 1
+        if self._dataLast == None:
+            changed = self._upperbound - 1
+        else:
+            changed = data ^ self._dataLast
+
+        setMask = self._scatter(data & changed)
+        clearMask = self._scatter(changed & ~data)
+
+        if setMask:
+            self._hal.SetGpioMask(setMask)
+        if clearMask:
+            self._hal.ClearGpioMask(clearMask)
+
+        self._dataLast = data
+
+    def _scatter(self, value):
+        mask = 0
+        for table in self._scatterTables:
+            mask |= table[value & 0xFF]
+            value >>= 8
+
+        return mask
+
+    def _buildScatterTables(self):
+        # One table per byte of the bus mapping that byte's value to the
+        # mask of pins it drives, so an address scatters in a few lookups
+        tables = []
+        for base in range(0, self._width, 8):
+            pinMasks = self._pinMasks[base:base + 8]
+            table = [0] * (1 << len(pinMasks))
+            for value in range(1, len(table)):
+                lowest = value & -value
+                table[value] = table[value ^ lowest] | pinMasks[lowest.bit_length() - 1]
+            tables.append(tuple(table))
+
+        return tuple(tables)
        
     def _writeBit(self, bit, state):
         pin = self._pins[bit]
         return self._hal.WriteGpio(pin, state)
 
 class CounterBasedAddressBus(OutputBus, Disposable):
-    def __init__(self, hal, width, frequency, resetPin, clockPin, loadPin = None):
+    # HAL calls per counter operation
+    PulseCost = 2
+    ResetCost = 4
+    LoadCost = 4
+
+    def __init__(self, hal, width, frequency, resetPin, clockPin, loadPin = None, presetBus : OutputBus = None, loadActiveState = State.LOW,
+                 timing : Timing = None, wraps = True):
+        super().__init__()
         self._hal = hal
-        if frequency > 0:
-            self._halfPeriod = 0.5 / frequency
-        else:
-            self._halfPeriod = 0
+        self._timing = timing
+        self.SetFrequency(frequency)
         self._width = width
         self._upperbound = 2 ** width
         self._end = 1 << width
         self._resetPin = resetPin
         self._clockPin = clockPin
         self._loadPin = loadPin
+        self._presetBus = presetBus
+        self._loadActiveState = loadActiveState
+        self._loadInactiveState = State.HIGH if loadActiveState == State.LOW else State.LOW
         self._hal.ConfigureGpio(resetPin, Direction.OUTPUT)
         self._hal.ConfigureGpio(clockPin, Direction.OUTPUT)
         if loadPin != None:
+            if presetBus == None:
+                raise ValueError("a load pin requires a preset bus")
             self._hal.ConfigureGpio(loadPin, Direction.OUTPUT)
+            self._hal.WriteGpio(loadPin, self._loadInactiveState)
+        costModel = SeekCostModel(self.PulseCost, self.ResetCost, self.LoadCost)
+        self._planner = self._createPlanner(width, costModel, presetBus if loadPin != None else None, wraps)
         self.Reset()
 
     def _OnDispose(self):
@@ -156,27 +295,89 @@ class CounterBasedAddressBus(OutputBus, Disposable):
             self._seek(delta, os.SEEK_CUR)
         else:
             self._seek(value)
-        
+
+    def GetWriteCost(self, value):
+        return self._planner.Plan(self._lastValue, value, self._getCountingUp()).cost
+
+    def GetWiring(self):
+        wiring = { 'type': type(self).__name__, 'width': self._width, 'reset': self._resetPin, 'clock': self._clockPin }
+        if self._loadPin != None:
+            wiring['load'] = self._loadPin
+            wiring['preset'] = self._presetBus.GetWiring()
+        return wiring
+
+    def _createPlanner(self, width, costModel, presetBus, wraps):
+        return SeekPlanner(width, costModel, presetBus, wraps)
+
+    def _getCountingUp(self):
+        return True
+
+    def OrderSeeks(self, values):
+        return self._planner.Order(self._lastValue, values, self._getCountingUp())
+
+    def SetTiming(self, timing : Timing):
+        self._timing = timing
+
+    def SetFrequency(self, frequency):
+        self._frequency = frequency
+        if frequency > 0:
+            self._halfPeriod = int(0.5e9 / frequency)
+            # Calibrating the default timing takes a while, so only a
+            # throttled clock pays for it
+            if self._timing == None:
+                self._timing = HybridTiming()
+        else:
+            self._halfPeriod = 0
+        self.ResetTimingStatistics()
+
+    def GetRequestedFrequency(self):
+        return self._frequency
+
+    # Measured over throttled pulses only, None while unthrottled
+    def GetAchievedFrequency(self):
+        if self._pulseTime == 0:
+            return None
+        return self._pulseCount * 1e9 / self._pulseTime
+
+    def ResetTimingStatistics(self):
+        self._pulseCount = 0
+        self._pulseTime = 0
+
     def _pulseReset(self):
         self._hal.WriteGpio(self._resetPin,State.LOW)
         self._pulseClock()
         self._hal.WriteGpio(self._resetPin,State.HIGH)
 
     def _pulseClock(self):
+        if self._halfPeriod == 0:
+            # Unthrottled, so nothing to time or measure
+            self._hal.WriteGpio(self._clockPin,State.HIGH)
+            self._hal.WriteGpio(self._clockPin,State.LOW)
+            return
+
+        # Each phase is timed from its own edge so a delayed HAL call
+        # cannot shorten what the counter sees
+        start = time.perf_counter_ns()
         self._hal.WriteGpio(self._clockPin,State.HIGH)
-        if self._halfPeriod > 0:
-            time.sleep(self._halfPeriod)
+        self._timing.Wait(self._halfPeriod)
         self._hal.WriteGpio(self._clockPin,State.LOW)
-        if self._halfPeriod > 0:
-            time.sleep(self._halfPeriod)
+        self._timing.Wait(self._halfPeriod)
+        self._pulseCount += 1
+        self._pulseTime += time.perf_counter_ns() - start
         
-    def _step(self):
+    def _load(self, value):
+        # Synchronous parallel load of the preset value on the next clock
+        self._presetBus.Write(value)
+        self._hal.WriteGpio(self._loadPin, self._loadActiveState)
         self._pulseClock()
-        self._lastValue += 1
+        self._hal.WriteGpio(self._loadPin, self._loadInactiveState)
+        self._lastValue = value
+
+    def Advance(self):
+        self._pulseClock()
+        self._lastValue = (self._lastValue + 1) & (self._upperbound - 1)
         
     def _seek(self, offset, whence = os.SEEK_SET):
-        # TODO: support counter load - for now we do things the long way
-   
         if whence == os.SEEK_SET:
             value = offset
         elif whence == os.SEEK_CUR:
@@ -191,24 +392,177 @@ class CounterBasedAddressBus(OutputBus, Disposable):
         #        value = self.lastValue + offset
         #    case os.SEEK_END:
         #        raise NotImplementedError
-        
-        if value > self._lastValue:
-            steps = value - self._lastValue
-        elif value < self._lastValue:
-            # Reset the counter
+
+        self._execute(self._planner.Plan(self._lastValue, value, self._getCountingUp()))
+
+    def _execute(self, step):
+        if step.method == SeekMethod.LOAD:
+            self._load(step.target)
+            return
+
+        if step.method == SeekMethod.RESET:
             self._pulseReset()
-            # step from zero
-            steps = value
-        else:
-            steps = 0
-            
-        #print("current: {}".format(self._lastValue))
-        #print("value: {}".format(value))
-        #print("steps: {}".format(steps))
 
         # Pulse until the value is reached
-        for s in range(0, steps):
+        for s in range(0, step.pulses):
             self._pulseClock()
 
-        self._lastValue = value
-        
+        self._lastValue = step.target
+
+class UpDownCounterAddressBus(CounterBasedAddressBus):
+    # 74HC191-style cascade with a direction input, counting up while the
+    # direction pin is at upState
+    def __init__(self, hal, width, frequency, resetPin, clockPin, directionPin, upState = State.LOW, **kwargs):
+        self._directionPin = directionPin
+        self._upState = upState
+        self._downState = State.HIGH if upState == State.LOW else State.LOW
+        hal.ConfigureGpio(directionPin, Direction.OUTPUT)
+        hal.WriteGpio(directionPin, upState)
+        self._countingUp = True
+        super().__init__(hal, width, frequency, resetPin, clockPin, **kwargs)
+
+    def _createPlanner(self, width, costModel, presetBus, wraps):
+        return SeekPlanner(width, costModel, presetBus, wraps, canCountDown=True)
+
+    def _getCountingUp(self):
+        return self._countingUp
+
+    def GetWiring(self):
+        wiring = super().GetWiring()
+        wiring['direction'] = self._directionPin
+        return wiring
+
+    def _setCountingUp(self, up):
+        if up != self._countingUp:
+            self._hal.WriteGpio(self._directionPin, self._upState if up else self._downState)
+            self._countingUp = up
+
+    def Advance(self):
+        self._setCountingUp(True)
+        super().Advance()
+
+    def _execute(self, step):
+        if step.method == SeekMethod.BACKWARD:
+            self._setCountingUp(False)
+            for s in range(0, step.pulses):
+                self._pulseClock()
+            self._lastValue = step.target
+            return
+
+        if step.method != SeekMethod.NONE:
+            self._setCountingUp(True)
+        super()._execute(step)
+
+class ShiftRegisterAddressBus(OutputBus, Disposable):
+    # Daisy-chained 74HC595s; address bit n sits at stage n of the chain,
+    # stage 0 being nearest the serial input, and bits are shifted in most
+    # significant first. Data shifts on the rising clock edge and reaches
+    # the outputs on the rising latch edge.
+    def __init__(self, hal, width, dataPin, clockPin, latchPin):
+        super().__init__()
+        self._hal = hal
+        self._width = width
+        self._upperbound = 2 ** width
+        self._dataPin = dataPin
+        self._clockPin = clockPin
+        self._latchPin = latchPin
+        self._portIo = hal.supportsPortIo
+        for pin in (dataPin, clockPin, latchPin):
+            self._hal.ConfigureGpio(pin, Direction.OUTPUT)
+            self._hal.WriteGpio(pin, State.LOW)
+        self._dataHigh = False
+        self.Reset()
+
+    def _OnDispose(self):
+        self.Reset()
+
+    def GetWidth(self):
+        return self._width
+
+    def GetUpperbound(self):
+        return self._upperbound
+
+    def GetWiring(self):
+        return { 'type': type(self).__name__, 'width': self._width, 'data': self._dataPin, 'clock': self._clockPin, 'latch': self._latchPin }
+
+    def Reset(self):
+        self._chain = None
+        self.Write(0)
+
+    def Write(self, value):
+        operations, dataHigh = self._sequence(value)
+        hal = self._hal
+        for mask, state in operations:
+            if self._portIo:
+                if state == State.HIGH:
+                    hal.SetGpioMask(mask)
+                else:
+                    hal.ClearGpioMask(mask)
+            else:
+                for pin in (self._dataPin, self._clockPin, self._latchPin):
+                    if mask & (1 << pin):
+                        hal.WriteGpio(pin, state)
+
+        self._dataHigh = dataHigh
+        self._chain = value
+
+    def Advance(self):
+        self.Write((self._chain + 1) & (self._upperbound - 1))
+
+    def GetWriteCost(self, value):
+        operations = self._sequence(value)[0]
+        if self._portIo:
+            return len(operations)
+
+        cost = 0
+        for mask, state in operations:
+            cost += bin(mask).count('1')
+
+        return cost
+
+    def _shiftCount(self, value):
+        # Shifting k bits moves every stage up by k, so the chain only needs
+        # the fewest shifts that leave the upper stages already correct
+        if self._chain == None:
+            return self._width
+
+        mask = self._upperbound - 1
+        for count in range(0, self._width):
+            if value >> count == self._chain & (mask >> count):
+                return count
+
+        return self._width
+
+    def _sequence(self, value):
+        # Builds the pin operations for a write as (mask, state) pairs,
+        # folding the trailing clock fall into the next data or latch change
+        count = self._shiftCount(value)
+        if count == 0:
+            return [], self._dataHigh
+
+        dataMask = 1 << self._dataPin
+        clockMask = 1 << self._clockPin
+        latchMask = 1 << self._latchPin
+
+        operations = []
+        dataHigh = self._dataHigh
+        clockHigh = False
+        for bit in range(count - 1, -1, -1):
+            if value & (1 << bit):
+                if clockHigh:
+                    operations.append((clockMask, State.LOW))
+                if not dataHigh:
+                    operations.append((dataMask, State.HIGH))
+                    dataHigh = True
+            else:
+                mask = (clockMask if clockHigh else 0) | (dataMask if dataHigh else 0)
+                if mask:
+                    operations.append((mask, State.LOW))
+                dataHigh = False
+            operations.append((clockMask, State.HIGH))
+            clockHigh = True
+
+        operations.append((latchMask, State.HIGH))
+        operations.append((latchMask | clockMask, State.LOW))
+
+        return operations, dataHigh
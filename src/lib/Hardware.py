@@ -13,6 +13,10 @@ class Bus(ABC):
     def GetUpperbound(self):
         pass
 
+    # Describes how the bus is connected, for keying per-wiring settings
+    def GetWiring(self):
+        return { 'type': type(self).__name__, 'width': self.width }
+
     @property
     def width(self):
         return self.GetWidth()
@@ -30,6 +34,16 @@ class OutputBus(Bus):
     @abstractmethod
     def Write(self, data):
         pass
+
+    # Present the value after the last one written, wrapping at the upper
+    # bound; implementations make this their cheapest operation
+    @abstractmethod
+    def Advance(self):
+        pass
+
+    # Estimated HAL calls needed to present the given value
+    def GetWriteCost(self, data):
+        return self.width
        
 class BidirectionalBus(InputBus, OutputBus):
     pass
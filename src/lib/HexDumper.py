@@ -31,6 +31,11 @@ class HexDumper(BytesSink, Disposable):
     def Reset(self):
         self._offset = 0
         self._buffer = []
+
+    # Sets the address shown for the next byte written
+    def Seek(self, offset = 0):
+        self._offset = offset
+        self._buffer = []
     
     def Write(self, data):
         self._buffer += data
@@ -87,7 +92,7 @@ class HexDumper(BytesSink, Disposable):
 
         if self.options.layoutFlags & Layout.ASCII:
             if self.options.layoutFlags & Layout.HEXDUMP:
-                print(" ", end="")
+                print(" ", end="", file=self.os)
             print(asciiLine, end="", file=self.os)
             
-        print()
+        print(file=self.os)
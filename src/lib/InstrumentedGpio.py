@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+
+from Core import Disposable
+from Gpio import Gpio, State, Direction
+
+class PinStatistics():
+    def __init__(self):
+        self.configures = 0
+        self.reads = 0
+        self.writes = 0
+        self.redundantWrites = 0
+
+class LatencyHistogram():
+    # Power-of-two nanosecond buckets
+    def __init__(self):
+        self.Reset()
+
+    def __str__(self):
+        if self.count == 0:
+            return 'n/a'
+
+        s = f'n={self.count} mean={self.total // self.count}ns min={self.minimum}ns max={self.maximum}ns |'
+        for bucket in sorted(self._buckets):
+            s += f' <{1 << bucket}ns:{self._buckets[bucket]}'
+
+        return s
+
+    def Reset(self):
+        self._buckets = {}
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = 0
+
+    def Record(self, ns):
+        bucket = ns.bit_length()
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ns
+        if self.minimum == None or ns < self.minimum:
+            self.minimum = ns
+        if ns > self.maximum:
+            self.maximum = ns
+
+class InstrumentedGpio(Gpio, Disposable):
+    # Sits in front of another backend, which it does not own, and prints
+    # a summary of the traffic when disposed
+    def __init__(self, hal : Gpio, os = sys.stdout):
+        super().__init__()
+        self._hal = hal
+        self._os = os
+        self.Reset()
+
+    def __str__(self):
+        s = 'pin  configures      reads     writes  redundant\n'
+        for pin in sorted(self._pins):
+            stats = self._pins[pin]
+            s += f'{pin:>3} {stats.configures:>11} {stats.reads:>10} {stats.writes:>10} {stats.redundantWrites:>10}\n'
+
+        for name, histogram in self._latencies.items():
+            if histogram.count > 0:
+                s += f'{name}: {histogram}\n'
+
+        return s
+
+    def _OnDispose(self):
+        print(self, file=self._os)
+
+    def Reset(self):
+        self._pins = {}
+        self._states = {}
+        self._inputs = set()
+        self._latencies = {
+            'configure': LatencyHistogram(),
+            'read': LatencyHistogram(),
+            'write': LatencyHistogram(),
+            'readPort': LatencyHistogram(),
+            'setMask': LatencyHistogram(),
+            'clearMask': LatencyHistogram()
+            }
+
+    def GetPinStatistics(self, pin):
+        return self._getPin(pin)
+
+    def GetLatency(self, name):
+        return self._latencies[name]
+
+    def ConfigureGpio(self, pin, dir):
+        start = time.perf_counter_ns()
+        self._hal.ConfigureGpio(pin, dir)
+        self._latencies['configure'].Record(time.perf_counter_ns() - start)
+        self._getPin(pin).configures += 1
+        self._states.pop(pin, None)
+        if dir == Direction.INPUT:
+            self._inputs.add(pin)
+        else:
+            self._inputs.discard(pin)
+
+    def ReadGpio(self, pin):
+        start = time.perf_counter_ns()
+        state = self._hal.ReadGpio(pin)
+        self._latencies['read'].Record(time.perf_counter_ns() - start)
+        self._getPin(pin).reads += 1
+        return state
+
+    def WriteGpio(self, pin, state):
+        start = time.perf_counter_ns()
+        self._hal.WriteGpio(pin, state)
+        self._latencies['write'].Record(time.perf_counter_ns() - start)
+        self._recordWrite(pin, state)
+
+    def GetSupportsPortIo(self):
+        return self._hal.supportsPortIo
+
+    def ReadGpioPort(self):
+        start = time.perf_counter_ns()
+        levels = self._hal.ReadGpioPort()
+        self._latencies['readPort'].Record(time.perf_counter_ns() - start)
+        # A port read samples every pin, count it against the inputs
+        for pin in self._inputs:
+            self._getPin(pin).reads += 1
+        return levels
+
+    def SetGpioMask(self, mask):
+        start = time.perf_counter_ns()
+        self._hal.SetGpioMask(mask)
+        self._latencies['setMask'].Record(time.perf_counter_ns() - start)
+        self._recordMask(mask, State.HIGH)
+
+    def ClearGpioMask(self, mask):
+        start = time.perf_counter_ns()
+        self._hal.ClearGpioMask(mask)
+        self._latencies['clearMask'].Record(time.perf_counter_ns() - start)
+        self._recordMask(mask, State.LOW)
+
+    def _getPin(self, pin):
+        stats = self._pins.get(pin)
+        if stats == None:
+            stats = PinStatistics()
+            self._pins[pin] = stats
+
+        return stats
+
+    def _recordWrite(self, pin, state):
+        stats = self._getPin(pin)
+        stats.writes += 1
+        if self._states.get(pin) == state:
+            stats.redundantWrites += 1
+        self._states[pin] = state
+
+    def _recordMask(self, mask, state):
+        pin = 0
+        while mask:
+            if mask & 1:
+                self._recordWrite(pin, state)
+            mask >>= 1
+            pin += 1
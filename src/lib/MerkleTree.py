@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+import struct
+import hashlib
+
+from HashGenerator import BytesHasher
+
+# Leaves and inner nodes are hashed with different prefixes so a leaf can
+# never pass for a node
+LeafPrefix = b'\x00'
+NodePrefix = b'\x01'
+
+class MerkleTree():
+    # Hashes of fixed-size blocks of an image with a binary tree built over
+    # them; an odd node at the end of a level moves up unpaired. Comparing
+    # two trees from the root visits only the branches that differ.
+    Magic = b'PPRM'
+    Version = 1
+    _Header = struct.Struct('<4sBIQB')
+
+    def __init__(self, blockSize, size, algorithm, leaves):
+        self.blockSize = blockSize
+        self.size = size
+        self.algorithm = algorithm
+        self._levels = [list(leaves)]
+        while len(self._levels[-1]) > 1:
+            self._levels.append(self._combine(self._levels[-1]))
+
+    def GetRoot(self):
+        level = self._levels[-1]
+        return level[0] if level else hashlib.new(self.algorithm).digest()
+
+    def GetBlockCount(self):
+        return len(self._levels[0])
+
+    def GetBlockRange(self, block):
+        offset = block * self.blockSize
+        return offset, min(self.blockSize, self.size - offset)
+
+    def Diff(self, other):
+        # Indices of the blocks whose hashes differ
+        if (other.blockSize, other.size, other.algorithm) != (self.blockSize, self.size, self.algorithm):
+            raise ValueError('trees do not cover the same blocks')
+
+        blocks = []
+        if self.GetBlockCount() > 0:
+            self._diff(other, len(self._levels) - 1, 0, blocks)
+        return blocks
+
+    def Save(self, path):
+        # The sidecar manifest holds only the leaves, the rest is rebuilt
+        name = self.algorithm.encode()
+        with open(path, "wb") as file:
+            file.write(self._Header.pack(self.Magic, self.Version, self.blockSize, self.size, len(name)))
+            file.write(name)
+            for leaf in self._levels[0]:
+                file.write(leaf)
+
+    @classmethod
+    def Load(cls, path):
+        with open(path, "rb") as file:
+            magic, version, blockSize, size, nameLength = cls._Header.unpack(file.read(cls._Header.size))
+            if magic != cls.Magic or version != cls.Version:
+                raise ValueError(f'{path} is not a block hash manifest')
+
+            algorithm = file.read(nameLength).decode()
+            digestSize = hashlib.new(algorithm).digest_size
+            count = (size + blockSize - 1) // blockSize
+            data = file.read(count * digestSize)
+            if len(data) != count * digestSize:
+                raise ValueError(f'{path} is truncated')
+
+        leaves = [data[i:i + digestSize] for i in range(0, len(data), digestSize)]
+        return cls(blockSize, size, algorithm, leaves)
+
+    def _combine(self, level):
+        parents = []
+        for i in range(0, len(level) - 1, 2):
+            parents.append(hashlib.new(self.algorithm, NodePrefix + level[i] + level[i + 1]).digest())
+        if len(level) % 2:
+            parents.append(level[-1])
+
+        return parents
+
+    def _diff(self, other, level, index, blocks):
+        if self._levels[level][index] == other._levels[level][index]:
+            return
+
+        if level == 0:
+            blocks.append(index)
+            return
+
+        below = len(self._levels[level - 1])
+        for child in (2 * index, 2 * index + 1):
+            if child < below:
+                self._diff(other, level - 1, child, blocks)
+
+class MerkleHasher(BytesHasher):
+    # Builds a MerkleTree over the bytes written, one leaf per blockSize
+    # bytes, with the trailing partial block hashed as it is
+    def __init__(self, blockSize = 1024, algorithm = 'sha256'):
+        self.blockSize = blockSize
+        self.algorithm = algorithm
+        self.Reset()
+
+    def __str__(self):
+        return f'merkle-{self.algorithm}: {self.GetHexDigest()}'
+
+    def Reset(self):
+        self._leaves = []
+        self._pending = bytearray()
+        self._size = 0
+
+    def Write(self, data):
+        self._size += len(data)
+        view = memoryview(data)
+
+        if self._pending:
+            take = min(self.blockSize - len(self._pending), len(view))
+            self._pending += view[:take]
+            view = view[take:]
+            if len(self._pending) < self.blockSize:
+                return
+            self._addLeaf(self._pending)
+            self._pending = bytearray()
+
+        whole = len(view) - len(view) % self.blockSize
+        for offset in range(0, whole, self.blockSize):
+            self._addLeaf(view[offset:offset + self.blockSize])
+        self._pending += view[whole:]
+
+    def GetTree(self):
+        leaves = list(self._leaves)
+        if self._pending:
+            leaves.append(self._hashLeaf(self._pending))
+
+        return MerkleTree(self.blockSize, self._size, self.algorithm, leaves)
+
+    def GetDigest(self):
+        return self.GetTree().GetRoot()
+
+    def GetHexDigest(self):
+        return self.GetDigest().hex()
+
+    def Save(self, path):
+        self.GetTree().Save(path)
+
+    def _addLeaf(self, block):
+        self._leaves.append(self._hashLeaf(block))
+
+    def _hashLeaf(self, block):
+        return hashlib.new(self.algorithm, LeafPrefix + block).digest()
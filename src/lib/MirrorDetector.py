@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+from BytesReader import BytesSink
+
+class MirrorDetector(BytesSink):
+    # Watches a read from address 0 for a part smaller than the bus, which
+    # shows up as copies of itself. Above a candidate power-of-two size
+    # each block is compared with the block one candidate below it; a
+    # mismatch moves on to the next size up, re-checking what has already
+    # arrived. Blocks of plain fill match anything filled the same way, so
+    # a candidate is only confirmed once confirmSpan bytes of other blocks
+    # have matched, over several copies of a small candidate, after which
+    # GetIsDone ends the read when the detector is added as a terminator.
+    #
+    # The received bytes are kept anyway for the de-duplicated image, so
+    # they are compared directly rather than through block hashes.
+    def __init__(self, upperBound, minSize = 256, confirmSpan = 4096, blockSize = 256):
+        self._upperBound = upperBound
+        self._minSize = minSize
+        self._blockSize = blockSize
+        self._confirmSpan = confirmSpan
+        self._data = bytearray(upperBound)
+        self._view = memoryview(self._data)
+        self.Reset()
+
+    def Reset(self):
+        self._length = 0
+        self._candidate = self._minSize
+        self._matched = 0
+        self._size = None
+
+    def Write(self, data):
+        if self._size != None:
+            return
+
+        start = self._length
+        count = min(len(data), self._upperBound - start)
+        self._view[start:start + count] = data[:count]
+        self._length += count
+        self._check(start)
+
+    def GetIsDone(self):
+        return self._size != None
+
+    # The confirmed size of the part, or None
+    def GetSize(self):
+        return self._size
+
+    # One copy of the part when a mirror was confirmed, otherwise
+    # everything received
+    def GetImage(self):
+        return self._view[:self._size if self._size != None else self._length]
+
+    def _check(self, position):
+        view = self._view
+        end = self._length
+        while self._size == None and self._candidate < self._upperBound:
+            candidate = self._candidate
+            position = max(position, candidate)
+            if position >= end:
+                return
+
+            stop = min(end, position + self._blockSize - position % self._blockSize)
+            block = view[position:stop]
+            if block != view[position - candidate:stop - candidate]:
+                self._candidate *= 2
+                self._matched = 0
+                position = self._candidate
+                continue
+
+            if block[1:] != block[:-1]:
+                self._matched += stop - position
+            if self._matched >= min(self._confirmSpan, self._upperBound - candidate):
+                self._size = candidate
+            position = stop
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+from BytesReader import BytesSink
+from BusReader import BusReaderBase
+from HashGenerator import HashingCollective
+from Settle import SettleModel
+from Timing import Timing
+import Hardware as hw
+
+class Socket():
+    # One chip on the shared address bus: its data bus, the image read from
+    # it so far and the running hashes of the bytes in read order
+    def __init__(self, dataBus : hw.InputBus, upperBound):
+        self.dataBus = dataBus
+        self.image = bytearray(upperBound)
+        self.hashes = HashingCollective()
+        self.sinks = [self.hashes]
+
+    def Reset(self):
+        for sink in self.sinks:
+            sink.Reset()
+
+class MultiSocketReader(BusReaderBase):
+    # Reads several chips that share the address lines but have their own
+    # data pins. Each address is presented once and every data bus sampled
+    # at it; when the data buses sit on one HAL with port I/O a single port
+    # snapshot serves all of them.
+    def __init__(self, addressBus : hw.OutputBus, dataBuses, settle : SettleModel = None, timing : Timing = None):
+        super().__init__(addressBus, settle, timing)
+        self._sockets = [Socket(dataBus, self._upperBound) for dataBus in dataBuses]
+        self._portHal = self._findPortHal(dataBuses)
+        self.Reset()
+
+    def _OnDispose(self):
+        self.Reset()
+
+    def Reset(self):
+        self._resetAddress()
+        for socket in self._sockets:
+            socket.dataBus.Reset()
+            socket.Reset()
+
+    def GetSocketCount(self):
+        return len(self._sockets)
+
+    def GetImage(self, socket):
+        return self._sockets[socket].image
+
+    def GetHashes(self, socket):
+        return self._sockets[socket].hashes
+
+    def AddSink(self, socket, sink : BytesSink):
+        self._sockets[socket].sinks.append(sink)
+
+    def GetIsSharingPort(self):
+        return self._portHal != None
+
+    def Read(self, size):
+        # Reads the next size addresses from every socket into its image and
+        # feeds the new bytes to its sinks; returns the number of addresses
+        start = self._offset
+        count = self._remaining(size)
+        views = [memoryview(socket.image)[start:start + count] for socket in self._sockets]
+        dataBuses = [socket.dataBus for socket in self._sockets]
+        targets = list(zip(views, dataBuses))
+
+        for index in range(0, count):
+            self._present(self._offset, index > 0)
+
+            if self._portHal != None:
+                levels = self._portHal.ReadGpioPort()
+                for view, dataBus in targets:
+                    view[index] = dataBus.Decode(levels)
+            else:
+                for view, dataBus in targets:
+                    view[index] = dataBus.Read()
+
+            self._offset += 1
+
+        for socket, view in zip(self._sockets, views):
+            for sink in socket.sinks:
+                sink.Write(view)
+
+        return count
+
+    @property
+    def eof(self):
+        return self.GetIsEOF()
+
+    def _findPortHal(self, dataBuses):
+        hals = set()
+        for dataBus in dataBuses:
+            getPortHal = getattr(dataBus, 'GetPortHal', None)
+            hal = getPortHal() if getPortHal != None else None
+            if hal == None:
+                return None
+            hals.add(id(hal))
+
+        if len(hals) != 1:
+            return None
+
+        return dataBuses[0].GetPortHal()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+
+from enum import Enum
+
+from BusReader import BusReader
+
+class SocketState(Enum):
+    OK = 0
+    ERASED = 1
+    EMPTY = 2
+    FLOATING = 3
+    STUCK = 4
+
+class PlanAction(Enum):
+    READ = 0
+    STOP = 1
+
+class ReadPlan():
+    def __init__(self, action : PlanAction, size, reason):
+        self.action = action
+        # Bytes from address 0 worth reading
+        self.size = size
+        self.reason = reason
+
+    def __str__(self):
+        if self.action == PlanAction.STOP:
+            return f'stop: {self.reason}'
+        return f'read 0x{self.size:X} bytes: {self.reason}'
+
+class ProbeResult():
+    def __init__(self, state : SocketState, size, stuckHigh, stuckLow, stuck, samples, unstable, plan : ReadPlan):
+        self.state = state
+        self.size = size
+        # Data bits that were set, or clear, in every sample
+        self.stuckHigh = stuckHigh
+        self.stuckLow = stuckLow
+        # Those of them sampled often enough to be worth checking the wiring
+        # for; a part with stuck bits is still read, so this is set on an
+        # OK state as well as on STUCK
+        self.stuck = stuck
+        self.samples = samples
+        self.unstable = unstable
+        self.plan = plan
+
+    def __str__(self):
+        return (f'state: {self.state.name}, size: 0x{self.size:X}, stuck high: 0x{self.stuckHigh:02X}, '
+                f'stuck low: 0x{self.stuckLow:02X}, stuck: 0x{self.stuck:02X}, {self.samples} samples, {self.unstable} unstable\n'
+                f'plan: {self.plan}')
+
+class Probe():
+    # Classifies a socket from a few reads before committing to a sweep.
+    # Every sample is read twice; a bus that reads differently each time
+    # is floating. The window of bytes at 0 settles an empty, floating or
+    # erased socket before anything further away is read.
+    #
+    # For the size, the window at 0 is compared with the window at each
+    # address line's weight: a part smaller than the bus ignores its upper
+    # lines, so the first line whose window repeats the one at 0 gives its
+    # size. Lines are probed from the bottom, stopping shortly after the
+    # first repeat or at the first line the address bus cannot reach for
+    # maxSeekCost HAL calls, so a probe behind a wide counter never clocks
+    # through a large part.
+    #
+    # An empty socket with pull-ups cannot be told from an erased part,
+    # and one with pull-downs from a part full of zeros. Bits that never
+    # change are only flagged in the result's stuck mask, as text and character ROMs leave some
+    # bits clear throughout; the probe stops on them only when the other
+    # bits float.
+    def __init__(self, reader : BusReader, window = 16, confirmLines = 1, floatingThreshold = 0.25,
+                 minStuckSamples = 32, maxSeekCost = 8192):
+        self._reader = reader
+        self._window = window
+        self._confirmLines = confirmLines
+        self._floatingThreshold = floatingThreshold
+        self._minStuckSamples = minStuckSamples
+        self._maxSeekCost = maxSeekCost
+        self._addressBus = reader.GetAddressBus()
+        self._width = self._addressBus.width
+
+    def Run(self):
+        self._samples = 0
+        self._unstable = 0
+        self._andMask = 0xFF
+        self._orMask = 0
+
+        upperBound = 1 << self._width
+        window = min(self._window, upperBound)
+        base = self._readWindow(0, window)
+
+        if self._unstable >= self._floatingThreshold * self._samples:
+            stuck = self._getStuck()
+            if stuck:
+                return self._result(SocketState.STUCK, upperBound, PlanAction.STOP,
+                                    f'data bits 0x{stuck:02X} never change while the rest float, check the wiring')
+            return self._result(SocketState.FLOATING, upperBound, PlanAction.STOP, 'data lines are floating, the socket looks empty')
+
+        if len(set(base)) == 1:
+            # A few more windows spread over the cheaply reachable range,
+            # away from powers of two that a small part folds back onto 0,
+            # so a part that merely starts with fill is not taken for an
+            # erased one
+            line = self._findReachableLine(window)
+            if line == None or self._isFilledLike(base, 1 << line, window):
+                if base[0] == 0xFF:
+                    return self._result(SocketState.ERASED, upperBound, PlanAction.STOP,
+                                        'every sample reads 0xFF, the part is erased or the socket empty')
+                if base[0] == 0x00:
+                    return self._result(SocketState.EMPTY, upperBound, PlanAction.STOP,
+                                        'every sample reads 0x00, the socket looks empty')
+            return self._result(SocketState.OK, upperBound, PlanAction.READ,
+                                'the part starts with fill so its size is unknown, read with mirror detection')
+
+        size, limit = self._estimateSize(base, window)
+        if size < upperBound:
+            reason = f'the part mirrors above 0x{size:X}'
+        elif limit < self._width:
+            reason = f'no mirroring below 0x{1 << limit:X}, higher lines are too costly to probe, read with mirror detection'
+        else:
+            reason = 'no mirroring found'
+
+        stuck = self._getStuck() if self._samples >= self._minStuckSamples else 0
+        if stuck:
+            reason += f'; data bits 0x{stuck:02X} never changed, check the wiring if the image looks wrong'
+
+        return self._result(SocketState.OK, size, PlanAction.READ, reason, stuck)
+
+    def _result(self, state, size, action, reason, stuck = None):
+        plan = ReadPlan(action, size if action == PlanAction.READ else 0, reason)
+        if stuck == None:
+            stuck = self._getStuck() if state == SocketState.STUCK else 0
+        return ProbeResult(state, size, self._andMask, ~self._orMask & 0xFF, stuck, self._samples, self._unstable, plan)
+
+    def _getStuck(self):
+        return self._andMask | (~self._orMask & 0xFF)
+
+    def _estimateSize(self, base, window):
+        # Returns the size and the first line left unprobed for its cost
+        confirming = None
+        line = 0
+        while line < self._width:
+            if self._addressBus.GetWriteCost(1 << line) > self._maxSeekCost:
+                break
+
+            repeats = self._readWindow(1 << line, window) == base
+            if repeats and confirming == None:
+                confirming = line
+            elif not repeats:
+                confirming = None
+
+            if confirming != None and line - confirming >= self._confirmLines:
+                break
+            line += 1
+
+        if confirming != None:
+            return 1 << confirming, line
+        return 1 << self._width, line
+
+    def _isFilledLike(self, base, reach, window, windows = 4):
+        for index in range(1, windows + 1):
+            offset = reach * index // (windows + 1)
+            if self._readWindow(offset, window) != base:
+                return False
+
+        return True
+
+    def _findReachableLine(self, window):
+        for line in range(self._width - 1, 0, -1):
+            if (1 << line) >= window and self._addressBus.GetWriteCost(1 << line) <= self._maxSeekCost:
+                return line
+
+        return None
+
+    def _readWindow(self, offset, count):
+        # Ascending reads keep a counter bus moving forwards
+        count = min(count, (1 << self._width) - offset)
+        data = bytearray()
+        for address in range(offset, offset + count):
+            self._reader.Seek(address)
+            first = self._reader.Read(1)[0]
+            self._reader.Seek(address)
+            second = self._reader.Read(1)[0]
+            if second != first:
+                self._unstable += 1
+            self._andMask &= first & second
+            self._orMask |= first | second
+            self._samples += 1
+            data.append(first)
+
+        return data
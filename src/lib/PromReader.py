@@ -8,36 +8,191 @@ from BytesReader import BytesSink, BytesSource, BytesReader
 from Ux import ProgressReporter
 from HexDumper import HexDumper
 from HashGenerator import HashingCollective
+from CheckpointJournal import CheckpointJournal
+from RomIndex import RomIndex
+from MirrorDetector import MirrorDetector
+
+class VerifyResult():
+    def __init__(self, blockSize):
+        self.blockSize = blockSize
+        self.blocks = 0
+        # Offsets of blocks that differed on every read, or on the first
+        # pass when aborted, and of blocks that matched or changed on a
+        # re-read
+        self.differences = []
+        self.flaky = []
+        # Set when the first pass ran over the mismatch budget
+        self.aborted = False
+
+    def GetPassed(self):
+        return not self.aborted and len(self.differences) == 0
+
+    def __str__(self):
+        if self.aborted:
+            verdict = 'aborted, mismatch budget exceeded'
+        else:
+            verdict = 'pass' if self.GetPassed() else 'fail'
+        s = f'verify: {verdict}, {self.blocks} blocks, {len(self.differences)} different, {len(self.flaky)} flaky\n'
+        for offset in self.differences:
+            s += f'different: 0x{offset:08X}\n'
+        for offset in self.flaky:
+            s += f'flaky: 0x{offset:08X}\n'
+
+        return s
 
 class PromReader(Disposable):
-    def __init__(self, source : BytesSource):
+    def __init__(self, source : BytesSource, journal : CheckpointJournal = None, mirrorDetector : MirrorDetector = None,
+                 pipelineDepth = 0):
         super().__init__()
-        self._reader = BytesReader(source, 64)
+        self._source = source
+        self._reader = BytesReader(source, 64, pipelineDepth)
 
         self._chunkSize = 1024
+        self._chunk = bytearray(self._chunkSize)
         
         self._hashGenerator = HashingCollective()
-        self._reader.AddSink(HexDumper(sys.stdout))
+        self._hexDumper = HexDumper(sys.stdout)
+        self._reader.AddSink(self._hexDumper)
         self._reader.AddSink(self._hashGenerator)
 
+        self._journal = journal
+        if journal:
+            self._reader.AddSink(journal)
+
+        self._mirrorDetector = mirrorDetector
+        if mirrorDetector:
+            self._reader.AddTerminator(mirrorDetector)
+
     def _OnDispose(self):
-        self._reader.Dispose()
+        # Disposing of the reader resets the journal, so record how far an
+        # interrupted read got first
+        try:
+            self._commit()
+        finally:
+            self._reader.Dispose()
 
     def Reset(self):
         self._reader.Reset()
 
     def Seek(self, offset, whence = os.SEEK_SET):
         self._reader.Seek(offset * self._chunkSize, whence)
-        
+
+    # Reads on from where Seek left the chip, address 0 at first and after
+    # Verify or Identify, or from the end of what the journal holds
     def Read(self, chunks):
+        if self._journal:
+            self._resume()
 
         while not self._reader.eof:
-            self._reader.Read(self._chunkSize)
+            self._reader.ReadInto(self._chunk)
             if self._reader.eof:
                 break
 
+        self._commit()
+        if self._mirrorDetector and self._mirrorDetector.GetSize() != None:
+            # Stopped on a mirror, so hash one copy of the part
+            print(f'mirrors every 0x{self._mirrorDetector.GetSize():X} bytes')
+            self._hashGenerator.Reset()
+            self._hashGenerator.Write(self._mirrorDetector.GetImage())
         print(self._hashGenerator)
 
+    def Identify(self, index : RomIndex, sizes = None, maxMismatches = 0):
+        # Samples the chip at each indexed size's fingerprint addresses and
+        # returns the known ROMs it may be, closest first; a candidate with
+        # a local image can then be confirmed with Verify instead of a dump.
+        # The chip is left at address 0 for Read.
+        self._reader.Flush()
+        candidates = []
+        try:
+            for size in sizes if sizes != None else index.GetSizes():
+                samples = index.Sample(self._source, size)
+                candidates += index.Identify(size, samples, maxMismatches)
+        finally:
+            self._reader.Seek(0)
+
+        candidates.sort(key=lambda candidate: candidate.mismatches)
+        return candidates
+
+    def Verify(self, imagePath, mismatchBudget = 0, retries = 2):
+        # Streams the chip against a known image a chunk at a time. More
+        # than mismatchBudget mismatching chunks is a no-go and stops the
+        # pass; otherwise only the mismatching chunks are read again, and
+        # one that matches or reads differently on any retry is flaky
+        # rather than different. The chip is left at address 0 for Read.
+        self._reader.Flush()
+        try:
+            return self._verify(imagePath, mismatchBudget, retries)
+        finally:
+            self._reader.Seek(0)
+
+    def _verify(self, imagePath, mismatchBudget, retries):
+        result = VerifyResult(self._chunkSize)
+        golden = bytearray(self._chunkSize)
+        mismatches = []
+
+        with open(imagePath, "rb") as image:
+            self._source.Seek(0)
+            offset = 0
+            while True:
+                count = image.readinto(golden)
+                if count == 0:
+                    break
+
+                result.blocks += 1
+                if self._readChunk(offset, count) != golden[:count]:
+                    mismatches.append(offset)
+                    if len(mismatches) > mismatchBudget:
+                        result.aborted = True
+                        result.differences = mismatches
+                        return result
+
+                offset += count
+
+            for offset in mismatches:
+                image.seek(offset)
+                expected = image.read(self._chunkSize)
+                first = bytes(self._readChunk(offset, len(expected), seek = True))
+
+                stable = first != expected
+                for retry in range(0, retries if stable else 0):
+                    again = self._readChunk(offset, len(expected), seek = True)
+                    if again == expected or again != first:
+                        stable = False
+                        break
+
+                if stable:
+                    result.differences.append(offset)
+                else:
+                    result.flaky.append(offset)
+
+        return result
+
+    def _readChunk(self, offset, count, seek = False):
+        if seek:
+            self._source.Seek(offset)
+
+        view = memoryview(self._chunk)[:count]
+        read = self._source.ReadInto(view)
+        return view[:read]
+
+    def _commit(self):
+        self._reader.Flush()
+        if self._journal:
+            self._journal.Checkpoint()
+
+    def _resume(self):
+        # Carry on from the journal: rebuild the hashes from what it already
+        # holds and seek past it
+        self._reader.Flush()
+        position = self._journal.GetPosition()
+        self._hashGenerator.Reset()
+        self._journal.Replay(self._hashGenerator)
+        if self._mirrorDetector:
+            self._mirrorDetector.Reset()
+            self._journal.Replay(self._mirrorDetector)
+        self._hexDumper.Seek(position)
+        self._reader.Seek(position)
+
     def GetIsEOF(self):
         return self._reader.eof
 
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import math
+import random
+import hashlib
+import binascii
+import xml.etree.ElementTree as ElementTree
+
+from BytesReader import BytesSource
+
+class RomEntry():
+    def __init__(self, name, size, crc32, sha1 = None, game = None, path = None, samples = None):
+        self.name = name
+        self.size = size
+        self.crc32 = crc32
+        self.sha1 = sha1
+        self.game = game
+        # Local copy of the image, and its bytes at the size's sample
+        # addresses once the index is built
+        self.path = path
+        self.samples = samples
+
+    def __str__(self):
+        game = f'{self.game}/' if self.game else ''
+        return f'{game}{self.name} ({self.size} bytes, crc32: {self.crc32:08x})'
+
+class RomCandidate():
+    def __init__(self, entry : RomEntry, mismatches):
+        self.entry = entry
+        self.mismatches = mismatches
+
+    def __str__(self):
+        return f'{self.entry}, {self.mismatches} sample mismatches'
+
+class RomIndex():
+    # Known ROMs by size, from dat files and local images. For every size
+    # with local images a set of sample addresses is chosen where those
+    # images differ most, and each image's bytes there are kept as its
+    # fingerprint, so a few reads from a chip narrow it down to candidates
+    # before, or instead of, a full dump.
+    Version = 1
+
+    def __init__(self, path = None):
+        self._sizes = {}
+        if path != None and os.path.exists(path):
+            self._load(path)
+
+    def AddDat(self, path):
+        # Logiqx XML dat files, as used by MAME and No-Intro
+        root = ElementTree.parse(path).getroot()
+        for game in root:
+            if game.tag not in ('game', 'machine'):
+                continue
+            for rom in game.iter('rom'):
+                if rom.get('size') == None or rom.get('crc') == None or rom.get('status') == 'nodump':
+                    continue
+                self._add(RomEntry(rom.get('name'), int(rom.get('size')), int(rom.get('crc'), 16),
+                                   rom.get('sha1'), game.get('name')))
+
+    def AddImage(self, path):
+        # Attaches a local image to the dat entries it matches, or adds it
+        # under its file name when none do
+        with open(path, "rb") as file:
+            data = file.read()
+
+        crc32 = binascii.crc32(data)
+        sha1 = hashlib.sha1(data).hexdigest()
+        matches = self.Match(len(data), crc32, sha1)
+        for entry in matches:
+            entry.path = path
+        if not matches:
+            self._add(RomEntry(os.path.basename(path), len(data), crc32, sha1, path=path))
+
+    def Build(self, sampleCount = 64, candidates = 4096, seed = 0):
+        for size, group in self._sizes.items():
+            entries = [entry for entry in group['entries'] if entry.path != None]
+            if not entries:
+                continue
+
+            images = []
+            for entry in entries:
+                with open(entry.path, "rb") as file:
+                    images.append(file.read())
+
+            addresses = self._chooseAddresses(size, images, sampleCount, candidates, random.Random(seed ^ size))
+            group['addresses'] = addresses
+            for entry, image in zip(entries, images):
+                entry.samples = bytes(image[address] for address in addresses)
+
+    def Save(self, path):
+        sizes = {}
+        for size, group in self._sizes.items():
+            sizes[str(size)] = {
+                'addresses': group['addresses'],
+                'entries': [self._saveEntry(entry) for entry in group['entries']]
+                }
+
+        temporary = path + '.tmp'
+        with open(temporary, "w") as file:
+            json.dump({ 'version': self.Version, 'sizes': sizes }, file, indent=1, sort_keys=True)
+        os.replace(temporary, path)
+
+    def GetSizes(self):
+        return sorted(self._sizes)
+
+    def GetAddresses(self, size):
+        group = self._sizes.get(size)
+        return group['addresses'] if group else []
+
+    def Match(self, size, crc32 = None, sha1 = None):
+        # Entries of this size with the given whole-image hashes
+        group = self._sizes.get(size)
+        if group == None:
+            return []
+
+        return [entry for entry in group['entries']
+                if (crc32 == None or entry.crc32 == crc32) and (sha1 == None or entry.sha1 == None or entry.sha1 == sha1)]
+
+    def Sample(self, source : BytesSource, size):
+        # Reads the sample addresses in ascending order, which keeps the
+        # seeks cheap on counter based address buses; the source is left
+        # past the last of them, so the caller seeks before reading on
+        samples = bytearray()
+        for address in self.GetAddresses(size):
+            source.Seek(address)
+            samples += source.Read(1)
+
+        return bytes(samples)
+
+    def Identify(self, size, samples, maxMismatches = 0):
+        # Candidates of this size whose fingerprints differ from the sampled
+        # bytes in at most maxMismatches places, closest first
+        group = self._sizes.get(size)
+        if group == None or len(samples) != len(group['addresses']):
+            return []
+
+        candidates = []
+        for entry in group['entries']:
+            if entry.samples == None:
+                continue
+            mismatches = sum(1 for a, b in zip(entry.samples, samples) if a != b)
+            if mismatches <= maxMismatches:
+                candidates.append(RomCandidate(entry, mismatches))
+
+        candidates.sort(key=lambda candidate: candidate.mismatches)
+        return candidates
+
+    def _add(self, entry : RomEntry):
+        group = self._sizes.setdefault(entry.size, { 'addresses': [], 'entries': [] })
+        for existing in group['entries']:
+            if existing.crc32 == entry.crc32 and existing.name == entry.name and existing.game == entry.game:
+                return
+        group['entries'].append(entry)
+
+    def _chooseAddresses(self, size, images, sampleCount, candidates, rng):
+        # Prefer addresses whose values vary most between the images, then
+        # ones holding something other than erased or zero fill; the random
+        # candidate order spreads ties across the whole image
+        pool = rng.sample(range(0, size), min(size, candidates))
+
+        def score(address):
+            counts = {}
+            for image in images:
+                value = image[address]
+                counts[value] = counts.get(value, 0) + 1
+            entropy = -sum(count / len(images) * math.log2(count / len(images)) for count in counts.values())
+            filled = sum(1 for image in images if image[address] not in (0x00, 0xFF))
+            return (entropy, filled)
+
+        pool.sort(key=score, reverse=True)
+        return sorted(pool[:sampleCount])
+
+    def _saveEntry(self, entry : RomEntry):
+        return {
+            'name': entry.name,
+            'size': entry.size,
+            'crc32': entry.crc32,
+            'sha1': entry.sha1,
+            'game': entry.game,
+            'path': entry.path,
+            'samples': entry.samples.hex() if entry.samples != None else None
+            }
+
+    def _load(self, path):
+        with open(path, "r") as file:
+            index = json.load(file)
+        if index.get('version') != self.Version:
+            raise ValueError(f'{path} is not a version {self.Version} rom index')
+
+        for size, group in index['sizes'].items():
+            entries = []
+            for entry in group['entries']:
+                samples = bytes.fromhex(entry['samples']) if entry['samples'] != None else None
+                entries.append(RomEntry(entry['name'], entry['size'], entry['crc32'], entry['sha1'],
+                                        entry['game'], entry['path'], samples))
+            self._sizes[int(size)] = { 'addresses': group['addresses'], 'entries': entries }
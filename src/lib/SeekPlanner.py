@@ -0,0 +1,102 @@
+from enum import Enum
+
+from Hardware import OutputBus
+
+class SeekMethod(Enum):
+    NONE = 0
+    FORWARD = 1
+    RESET = 2
+    WRAP = 3
+    LOAD = 4
+    BACKWARD = 5
+
+class SeekCostModel():
+    # Costs are in HAL calls
+    def __init__(self, pulseCost = 2, resetCost = 4, loadCost = 4, directionCost = 1):
+        self.pulseCost = pulseCost
+        self.resetCost = resetCost
+        self.loadCost = loadCost
+        # Switching an up/down counter between counting up and down
+        self.directionCost = directionCost
+
+class SeekStep():
+    def __init__(self, method : SeekMethod, target, pulses, cost):
+        self.method = method
+        self.target = target
+        self.pulses = pulses
+        self.cost = cost
+
+    def __str__(self):
+        return f'{self.method.name} to {self.target:#x}: {self.pulses} pulses, cost {self.cost}'
+
+class SeekPlanner():
+    def __init__(self, width, costModel : SeekCostModel = None, presetBus : OutputBus = None, canWrap = True, canCountDown = False):
+        self._upperbound = 1 << width
+        self._costModel = costModel if costModel != None else SeekCostModel()
+        self._presetBus = presetBus
+        self._canWrap = canWrap
+        self._canCountDown = canCountDown
+
+    # countingUp is the direction an up/down counter is left in; every
+    # step but BACKWARD counts up, so only steps that change it pay for
+    # the switch
+    def Plan(self, current, target, countingUp = True):
+        if target == current:
+            return SeekStep(SeekMethod.NONE, target, 0, 0)
+
+        model = self._costModel
+        candidates = []
+        upCost = 0 if countingUp else model.directionCost
+        downCost = model.directionCost if countingUp else 0
+
+        if target > current:
+            pulses = target - current
+            candidates.append(SeekStep(SeekMethod.FORWARD, target, pulses, upCost + pulses * model.pulseCost))
+        else:
+            candidates.append(SeekStep(SeekMethod.RESET, target, target, upCost + model.resetCost + target * model.pulseCost))
+            if self._canWrap:
+                pulses = self._upperbound - current + target
+                candidates.append(SeekStep(SeekMethod.WRAP, target, pulses, upCost + pulses * model.pulseCost))
+
+        if self._canCountDown:
+            if target < current:
+                pulses = current - target
+            elif self._canWrap:
+                pulses = current + self._upperbound - target
+            else:
+                pulses = None
+            if pulses != None:
+                candidates.append(SeekStep(SeekMethod.BACKWARD, target, pulses, downCost + pulses * model.pulseCost))
+
+        if self._presetBus != None and target < self._presetBus.upperbound:
+            cost = upCost + model.loadCost + self._presetBus.GetWriteCost(target)
+            candidates.append(SeekStep(SeekMethod.LOAD, target, 1, cost))
+
+        return min(candidates, key=lambda step: step.cost)
+
+    def Order(self, current, targets, countingUp = True):
+        # Ascending order starting from the current position visits every
+        # target in one forward pass plus at most one wrap or reset, which
+        # is the cheapest tour for an up counter; also consider starting
+        # from the lowest target in case a reset up front is cheaper
+        ordered = sorted(set(targets))
+        split = 0
+        while split < len(ordered) and ordered[split] < current:
+            split += 1
+
+        rotated = ordered[split:] + ordered[:split]
+        if self.GetCost(current, ordered, countingUp) < self.GetCost(current, rotated, countingUp):
+            return ordered
+
+        return rotated
+
+    def GetCost(self, current, targets, countingUp = True):
+        cost = 0
+        for target in targets:
+            step = self.Plan(current, target, countingUp)
+            cost += step.cost
+            if step.method != SeekMethod.NONE:
+                countingUp = step.method != SeekMethod.BACKWARD
+            current = target
+
+        return cost
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+
+# Delays are in nanoseconds
+
+class SettleModel(ABC):
+    @abstractmethod
+    def GetDelay(self, previous, current):
+        pass
+
+class ParallelSettle(SettleModel):
+    # Directly driven address lines: the chip's access time plus skew for
+    # each line that toggled
+    def __init__(self, baseDelay = 0, perLineDelay = 0):
+        self._baseDelay = baseDelay
+        self._perLineDelay = perLineDelay
+
+    def GetDelay(self, previous, current):
+        if previous == current:
+            return 0
+
+        return self._baseDelay + self._perLineDelay * bin(previous ^ current).count('1')
+
+class RippleSettle(SettleModel):
+    # Ripple counters such as the 4040: every stage that toggles on the
+    # final clock edge adds its propagation delay before the outputs settle
+    def __init__(self, baseDelay = 0, perStageDelay = 0):
+        self._baseDelay = baseDelay
+        self._perStageDelay = perStageDelay
+
+    def GetDelay(self, previous, current):
+        if previous == current:
+            return 0
+
+        if current == 0:
+            # Reached by an asynchronous reset or a full wrap
+            stages = bin(previous).count('1')
+        else:
+            stages = bin((current - 1) ^ current).count('1')
+
+        return self._baseDelay + self._perStageDelay * stages
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import queue
+import threading
+
+class SinkPipeline():
+    # Feeds each sink from its own worker thread through a bounded queue,
+    # so slow sinks such as a terminal dump no longer stall acquisition.
+    # Blocks reach every sink in the order they were dispatched; a full
+    # queue blocks the dispatcher. The first exception raised by a sink is
+    # re-raised on the dispatching thread by every Dispatch and Flush that
+    # follows, as the failed sink skips all later blocks; Reset discards
+    # the error and lets the sink see blocks again.
+    _Stop = object()
+
+    def __init__(self, depth):
+        self._depth = depth
+        self._workers = []
+        self._error = None
+        self._lock = threading.Lock()
+
+    def AddSink(self, sink):
+        work = queue.Queue(self._depth)
+        state = { 'failed': False }
+        thread = threading.Thread(target=self._run, args=(sink, work, state), daemon=True)
+        thread.start()
+        self._workers.append((work, thread, state))
+
+    def Dispatch(self, block):
+        self._raise()
+
+        # The block is usually a view of a buffer the caller goes on to
+        # reuse, so the workers get their own copy
+        block = bytes(block)
+        for work, thread, state in self._workers:
+            work.put(block)
+
+    def Flush(self):
+        self._join()
+        self._raise()
+
+    def Reset(self):
+        # Waits for the workers without raising, then forgets any failure
+        self._join()
+        with self._lock:
+            self._error = None
+            for work, thread, state in self._workers:
+                state['failed'] = False
+
+    def Close(self):
+        try:
+            self.Flush()
+        finally:
+            for work, thread, state in self._workers:
+                work.put(self._Stop)
+            for work, thread, state in self._workers:
+                thread.join()
+            self._workers = []
+
+    def _run(self, sink, work, state):
+        while True:
+            block = work.get()
+            try:
+                if block is self._Stop:
+                    return
+
+                # After a failure the rest of the stream is drained unseen
+                # so neither Flush nor a blocked Dispatch can hang
+                if not state['failed']:
+                    sink.Write(block)
+            except Exception as error:
+                state['failed'] = True
+                with self._lock:
+                    if self._error == None:
+                        self._error = error
+            finally:
+                work.task_done()
+
+    def _join(self):
+        for work, thread, state in self._workers:
+            work.join()
+
+    def _raise(self):
+        with self._lock:
+            error = self._error
+
+        if error != None:
+            raise error
@@ -0,0 +1,48 @@
+from Core import Disposable
+from Hardware import OutputBus
+
+class SplitAddressBus(OutputBus, Disposable):
+    # Drives the low address bits from one bus (typically a counter) and
+    # the bits above them from another (typically direct GPIO), so a bank
+    # change is a single write and only the in-bank offset is sought
+    def __init__(self, lowBus : OutputBus, highBus : OutputBus):
+        super().__init__()
+        self._lowBus = lowBus
+        self._highBus = highBus
+        self._lowWidth = lowBus.width
+        self._lowMask = lowBus.upperbound - 1
+        self._width = lowBus.width + highBus.width
+        self._upperbound = 2 ** self._width
+        self.Reset()
+
+    def _OnDispose(self):
+        self.Reset()
+
+    def GetWidth(self):
+        return self._width
+
+    def GetUpperbound(self):
+        return self._upperbound
+
+    def GetWiring(self):
+        return { 'type': type(self).__name__, 'low': self._lowBus.GetWiring(), 'high': self._highBus.GetWiring() }
+
+    def Reset(self):
+        self._lowBus.Reset()
+        self._highBus.Reset()
+        self._value = 0
+
+    def Write(self, value):
+        self._highBus.Write(value >> self._lowWidth)
+        self._lowBus.Write(value & self._lowMask)
+        self._value = value
+
+    def Advance(self):
+        if self._value & self._lowMask == self._lowMask:
+            # Carry into the high bus; the low bus wraps to zero
+            self._highBus.Advance()
+        self._lowBus.Advance()
+        self._value = (self._value + 1) & (self._upperbound - 1)
+
+    def GetWriteCost(self, value):
+        return self._highBus.GetWriteCost(value >> self._lowWidth) + self._lowBus.GetWriteCost(value & self._lowMask)
@@ -0,0 +1,73 @@
+import time
+
+from abc import ABC, abstractmethod
+
+# Deadlines are time.perf_counter_ns() values
+
+class Timing(ABC):
+    @abstractmethod
+    def WaitUntil(self, deadline):
+        pass
+
+    def Wait(self, ns):
+        if ns > 0:
+            self.WaitUntil(time.perf_counter_ns() + ns)
+
+class SleepTiming(Timing):
+    def WaitUntil(self, deadline):
+        remaining = deadline - time.perf_counter_ns()
+        if remaining > 0:
+            time.sleep(remaining / 1e9)
+
+class SpinTiming(Timing):
+    def __init__(self):
+        self.Calibrate()
+
+    def Calibrate(self, samples = 1000, batches = 5):
+        # Stop spinning one clock read early so the average wait lands on
+        # the deadline rather than one read past it. The quickest batch is
+        # used so a preemption while calibrating cannot inflate the figure.
+        overhead = None
+        for batch in range(0, batches):
+            start = time.perf_counter_ns()
+            for i in range(0, samples):
+                time.perf_counter_ns()
+            elapsed = (time.perf_counter_ns() - start) // samples
+            if overhead == None or elapsed < overhead:
+                overhead = elapsed
+        self._overhead = overhead
+
+    def GetOverhead(self):
+        return self._overhead
+
+    def WaitUntil(self, deadline):
+        deadline -= self._overhead
+        while time.perf_counter_ns() < deadline:
+            pass
+
+class HybridTiming(Timing):
+    # Sleeps through the bulk of a long wait and spins out the remainder,
+    # where the remainder covers the scheduler's observed wakeup latency
+    def __init__(self, spinThreshold = None):
+        self._spin = SpinTiming()
+        if spinThreshold == None:
+            self.Calibrate()
+        else:
+            self._spinThreshold = spinThreshold
+
+    def Calibrate(self, samples = 20, request = 50000):
+        worst = 0
+        for i in range(0, samples):
+            start = time.perf_counter_ns()
+            time.sleep(request / 1e9)
+            worst = max(worst, time.perf_counter_ns() - start - request)
+        self._spinThreshold = 2 * worst + request
+
+    def GetSpinThreshold(self):
+        return self._spinThreshold
+
+    def WaitUntil(self, deadline):
+        remaining = deadline - time.perf_counter_ns()
+        if remaining > self._spinThreshold:
+            time.sleep((remaining - self._spinThreshold) / 1e9)
+        self._spin.WaitUntil(deadline)
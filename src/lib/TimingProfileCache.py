@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import hashlib
+
+from Hardware import InputBus, OutputBus
+from Settle import ParallelSettle
+
+class TimingProfile():
+    def __init__(self, frequency, settleDelay):
+        self.frequency = frequency
+        self.settleDelay = settleDelay
+
+    def __str__(self):
+        return f'frequency: {self.frequency} Hz, settle: {self.settleDelay} ns'
+
+class TimingProfileCache():
+    # Calibrated timings per chip type and per fingerprint of the reader
+    # wiring they were measured on, so a chip read from several readers
+    # keeps a profile for each; recalibrating on one wiring replaces only
+    # that wiring's profile
+    def __init__(self, path = None):
+        if path == None:
+            path = os.path.join(os.path.expanduser('~'), '.cache', 'PiPromReader', 'timing.json')
+        self._path = path
+        self._profiles = {}
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                self._profiles = json.load(file)
+            for chip, entries in self._profiles.items():
+                # Files from before profiles were kept per wiring hold a
+                # single entry per chip
+                if 'wiring' in entries:
+                    self._profiles[chip] = { entries['wiring']: entries }
+
+    @staticmethod
+    def DescribeWiring(addressBus : OutputBus, dataBus : InputBus):
+        return { 'address': addressBus.GetWiring(), 'data': dataBus.GetWiring() }
+
+    @staticmethod
+    def GetFingerprint(wiring):
+        return hashlib.sha1(json.dumps(wiring, sort_keys=True).encode()).hexdigest()
+
+    def Get(self, chip, wiring):
+        entry = self._profiles.get(chip, {}).get(self.GetFingerprint(wiring))
+        if entry == None:
+            return None
+
+        return TimingProfile(entry['frequency'], entry['settleDelay'])
+
+    def Put(self, chip, wiring, profile : TimingProfile):
+        fingerprint = self.GetFingerprint(wiring)
+        self._profiles.setdefault(chip, {})[fingerprint] = {
+            'wiring': fingerprint,
+            'frequency': profile.frequency,
+            'settleDelay': profile.settleDelay
+            }
+        self._save()
+
+    def Invalidate(self, chip, wiring = None):
+        # Drops the chip's profile for this wiring, or all of them
+        entries = self._profiles.get(chip)
+        if entries == None:
+            return
+
+        if wiring == None:
+            del self._profiles[chip]
+        elif entries.pop(self.GetFingerprint(wiring), None) == None:
+            return
+        elif not entries:
+            del self._profiles[chip]
+        self._save()
+
+    def Resolve(self, chip, counterBus, reader, calibrator, minFrequency, maxFrequency, maxSettleDelay):
+        # Applies the cached profile for this chip and wiring, calibrating
+        # and caching one first when there is none; returns the profile
+        # and whether it came from the cache
+        wiring = self.DescribeWiring(reader.GetAddressBus(), reader.GetDataBus())
+        profile = self.Get(chip, wiring)
+        if profile != None:
+            counterBus.SetFrequency(profile.frequency)
+            reader.SetSettle(ParallelSettle(profile.settleDelay) if profile.settleDelay > 0 else None)
+            return profile, True
+
+        result = calibrator.Calibrate(counterBus, reader, minFrequency, maxFrequency, maxSettleDelay)
+        profile = TimingProfile(result.frequency, result.settleDelay)
+        self.Put(chip, wiring, profile)
+        return profile, False
+
+    def _save(self):
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temporary = self._path + '.tmp'
+        with open(temporary, "w") as file:
+            json.dump(self._profiles, file, indent=2, sort_keys=True)
+        os.replace(temporary, self._path)
@@ -3,11 +3,13 @@ import os
 
 sys.path.insert(0, os.path.abspath('../lib'))
 
-from Gpio import Gpio
+from Gpio import Gpio, State
 
 class MockGpio(Gpio):
-    def __init__(self, os = sys.stdout):
+    def __init__(self, os = sys.stdout, portIo = True):
         self._os = os
+        self._portIo = portIo
+        self._levels = 0
 
     def ConfigureGpio(self, pin, dir):
         print("GPIO: Configure {0} as {1}".format(pin, dir), file=self._os)
@@ -17,5 +19,23 @@ class MockGpio(Gpio):
         print("GPIO: Read {0} as {1}".format(pin, value), file=self._os)
 
     def WriteGpio(self, pin, state):
+        if state == State.HIGH:
+            self._levels |= 1 << pin
+        else:
+            self._levels &= ~(1 << pin)
         print("GPIO: Set {0} to {1}".format(pin, state), file=self._os)
 
+    def GetSupportsPortIo(self):
+        return self._portIo
+
+    def ReadGpioPort(self):
+        print("GPIO: Read port as {0:#x}".format(self._levels), file=self._os)
+        return self._levels
+
+    def SetGpioMask(self, mask):
+        self._levels |= mask
+        print("GPIO: Set mask {0:#x}".format(mask), file=self._os)
+
+    def ClearGpioMask(self, mask):
+        self._levels &= ~mask
+        print("GPIO: Clear mask {0:#x}".format(mask), file=self._os)
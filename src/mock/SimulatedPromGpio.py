@@ -0,0 +1,182 @@
+import sys
+import os
+import time
+import random
+
+sys.path.insert(0, os.path.abspath('../lib'))
+
+from Gpio import Gpio, State
+
+class SimulatedSocket():
+    def __init__(self, image, dataPins):
+        self.image = bytes(image) if image != None else None
+        self.dataPins = tuple(dataPins)
+        self.lastData = 0
+
+class SimulatedPromGpio(Gpio):
+    # A silent 27Cxxx-style part behind a HAL. The address is taken from an
+    # optional 4040-style ripple counter (active-low reset, counts on the
+    # falling clock edge) for the low bits and from any directly wired
+    # address pins for the bits above it. An active-low load pin presets
+    # the counter from the preset pins on the next falling edge and a high
+    # direction pin makes it count down. Instead of
+    # a counter, shift pins (data, clock, latch) model a 74HC595 chain
+    # holding the same low bits. Clock pulses shorter than minPulseWidth
+    # are missed. An image
+    # of None simulates an empty, floating socket; smaller images mirror
+    # across the bus. AddSocket wires further chips to their own data pins
+    # on the same address lines.
+    def __init__(self, image, dataPins, addressPins = (), resetPin = None, clockPin = None, counterWidth = 20,
+                 loadPin = None, presetPins = (), directionPin = None, shiftPins = None,
+                 accessTime = 0, minPulseWidth = 0, faultRate = 0.0, stuckHigh = 0, stuckLow = 0, seed = 0, portIo = True):
+        self._sockets = []
+        self._dataMask = 0
+        self.AddSocket(image, dataPins)
+        self._addressPins = tuple(addressPins)
+        self._resetPin = resetPin
+        self._clockPin = clockPin
+        self._loadPin = loadPin
+        self._presetPins = tuple(presetPins)
+        self._directionPin = directionPin
+        self._shiftPins = shiftPins
+        self._shift = 0
+        self._counterWidth = counterWidth if clockPin != None or shiftPins != None else 0
+        self._counterMask = (1 << self._counterWidth) - 1
+        self._accessTime = accessTime
+        self._minPulseWidth = minPulseWidth
+        self._clockRise = 0
+        self._faultRate = faultRate
+        self._stuckHigh = stuckHigh
+        self._stuckLow = stuckLow
+        self._random = random.Random(seed)
+        self._portIo = portIo
+
+        self._levels = 0
+        if resetPin != None:
+            self._levels |= 1 << resetPin
+        if loadPin != None:
+            self._levels |= 1 << loadPin
+        self._counter = 0
+        self._address = 0
+        self._addressTime = 0
+        self.ResetCallCount()
+
+    def AddSocket(self, image, dataPins):
+        socket = SimulatedSocket(image, dataPins)
+        self._sockets.append(socket)
+        for pin in socket.dataPins:
+            self._dataMask |= 1 << pin
+
+    def ResetCallCount(self):
+        self._callCount = 0
+
+    def GetCallCount(self):
+        return self._callCount
+
+    def GetAddress(self):
+        return self._counter | (self._readPins(self._addressPins) << self._counterWidth)
+
+    def _readPins(self, pins):
+        value = 0
+        bitValue = 1
+        for pin in pins:
+            if self._levels & (1 << pin):
+                value |= bitValue
+            bitValue <<= 1
+
+        return value
+
+    def ConfigureGpio(self, pin, dir):
+        self._callCount += 1
+
+    def ReadGpio(self, pin):
+        self._callCount += 1
+        for socket in self._sockets:
+            if pin in socket.dataPins:
+                data = self._readData(socket)
+                return State.HIGH if data & (1 << socket.dataPins.index(pin)) else State.LOW
+
+        return State.HIGH if self._levels & (1 << pin) else State.LOW
+
+    def WriteGpio(self, pin, state):
+        self._callCount += 1
+        if state == State.HIGH:
+            self._update(self._levels | (1 << pin))
+        else:
+            self._update(self._levels & ~(1 << pin))
+
+    def GetSupportsPortIo(self):
+        return self._portIo
+
+    def ReadGpioPort(self):
+        self._callCount += 1
+        levels = self._levels & ~self._dataMask
+        for socket in self._sockets:
+            data = self._readData(socket)
+            bitValue = 1
+            for pin in socket.dataPins:
+                if data & bitValue:
+                    levels |= 1 << pin
+                bitValue <<= 1
+
+        return levels
+
+    def SetGpioMask(self, mask):
+        self._callCount += 1
+        self._update(self._levels | mask)
+
+    def ClearGpioMask(self, mask):
+        self._callCount += 1
+        self._update(self._levels & ~mask)
+
+    def _update(self, levels):
+        last = self._levels
+        self._levels = levels
+        changed = last ^ levels
+
+        resetPin = self._resetPin
+        clockPin = self._clockPin
+        if resetPin != None and not levels & (1 << resetPin):
+            self._counter = 0
+        elif clockPin != None and changed & (1 << clockPin) and self._minPulseWidth and levels & (1 << clockPin):
+            self._clockRise = time.perf_counter_ns()
+        elif clockPin != None and changed & last & (1 << clockPin):
+            if self._minPulseWidth and time.perf_counter_ns() - self._clockRise < self._minPulseWidth:
+                # Too short for the counter to register
+                pass
+            elif self._loadPin != None and not levels & (1 << self._loadPin):
+                self._counter = self._readPins(self._presetPins) & self._counterMask
+            elif self._directionPin != None and levels & (1 << self._directionPin):
+                self._counter = (self._counter - 1) & self._counterMask
+            else:
+                self._counter = (self._counter + 1) & self._counterMask
+
+        if self._shiftPins != None:
+            dataPin, shiftClockPin, latchPin = self._shiftPins
+            if changed & levels & (1 << shiftClockPin):
+                self._shift = ((self._shift << 1) | ((levels >> dataPin) & 1)) & self._counterMask
+            if changed & levels & (1 << latchPin):
+                self._counter = self._shift
+
+        if self._accessTime:
+            address = self.GetAddress()
+            if address != self._address:
+                self._address = address
+                self._addressTime = time.perf_counter_ns()
+
+    def _readData(self, socket):
+        if socket.image == None:
+            # Nothing is driving the data lines, bar any stuck ones
+            return (self._random.getrandbits(8) | self._stuckHigh) & ~self._stuckLow & 0xFF
+
+        if self._accessTime and time.perf_counter_ns() - self._addressTime < self._accessTime:
+            # Outputs have not settled so the previous data is still visible
+            data = socket.lastData
+        else:
+            data = socket.image[self.GetAddress() % len(socket.image)]
+            socket.lastData = data
+
+        if self._faultRate and self._random.random() < self._faultRate:
+            data ^= 1 << self._random.randrange(0, 8)
+
+        return (data | self._stuckHigh) & ~self._stuckLow & 0xFF
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import mmap
+
+sys.path.insert(0, os.path.abspath('../lib'))
+
+from Core import Disposable
+from Gpio import Gpio, State, Direction
+
+# BCM283x GPIO register block, offsets in 32-bit words
+GPFSEL0 = 0x00 >> 2
+GPSET0 = 0x1C >> 2
+GPCLR0 = 0x28 >> 2
+GPLEV0 = 0x34 >> 2
+
+# /dev/gpiomem exposes a single page holding the register block
+MapSize = 4096
+
+FunctionInput = 0b000
+FunctionOutput = 0b001
+
+class MmapGpio(Gpio, Disposable):
+    def __init__(self, path = '/dev/gpiomem', offset = 0, emulateLevels = False):
+        super().__init__()
+        # emulateLevels mirrors set/clear writes into the level registers so
+        # a plain file behaves like looped-back pins
+        self._emulateLevels = emulateLevels
+        self._fd = os.open(path, os.O_RDWR | os.O_SYNC)
+        self._map = mmap.mmap(self._fd, MapSize, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE, offset=offset)
+        self._registers = memoryview(self._map).cast('I')
+
+    def _OnDispose(self):
+        self._registers.release()
+        self._map.close()
+        os.close(self._fd)
+
+    @staticmethod
+    def CreateRegisterFile(path):
+        with open(path, "wb") as file:
+            file.write(bytes(MapSize))
+
+    def ConfigureGpio(self, pin, dir):
+        register = GPFSEL0 + pin // 10
+        shift = (pin % 10) * 3
+        function = FunctionOutput if dir == Direction.OUTPUT else FunctionInput
+        value = self._registers[register] & ~(0b111 << shift)
+        self._registers[register] = value | (function << shift)
+
+    def ReadGpio(self, pin):
+        if self._registers[GPLEV0 + (pin >> 5)] & (1 << (pin & 31)):
+            return State.HIGH
+        return State.LOW
+
+    def WriteGpio(self, pin, state):
+        if state == State.HIGH:
+            self.SetGpioMask(1 << pin)
+        else:
+            self.ClearGpioMask(1 << pin)
+
+    def GetSupportsPortIo(self):
+        return True
+
+    def ReadGpioPort(self):
+        registers = self._registers
+        return registers[GPLEV0] | (registers[GPLEV0 + 1] << 32)
+
+    def SetGpioMask(self, mask):
+        self._writeMask(GPSET0, mask)
+        if self._emulateLevels:
+            self._writeLevels(self.ReadGpioPort() | mask)
+
+    def ClearGpioMask(self, mask):
+        self._writeMask(GPCLR0, mask)
+        if self._emulateLevels:
+            self._writeLevels(self.ReadGpioPort() & ~mask)
+
+    def _writeMask(self, register, mask):
+        low = mask & 0xFFFFFFFF
+        high = mask >> 32
+        if low:
+            self._registers[register] = low
+        if high:
+            self._registers[register + 1] = high
+
+    def _writeLevels(self, levels):
+        self._registers[GPLEV0] = levels & 0xFFFFFFFF
+        self._registers[GPLEV0 + 1] = (levels >> 32) & 0xFFFFFFFF
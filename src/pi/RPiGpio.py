@@ -12,16 +12,52 @@ import RPi.GPIO as GPIO
 
 class RPiGpio(Gpio, Disposable):
     def __init__(self):
+        super().__init__()
         GPIO.setmode(GPIO.BCM)
+        self._inputs = []
 
     def _OnDispose(self):
         GPIO.cleanup()
 
     def ConfigureGpio(self, pin, dir):
         GPIO.setup(pin, GPIO.OUT if dir == Direction.OUTPUT else GPIO.IN)
+        if pin in self._inputs:
+            self._inputs.remove(pin)
+        if dir == Direction.INPUT:
+            self._inputs.append(pin)
 
     def ReadGpio(self, pin):
         return State.HIGH if GPIO.input(pin) == GPIO.HIGH else State.LOW 
 
     def WriteGpio(self, pin, state):
         GPIO.output(pin, GPIO.HIGH if state == State.HIGH else GPIO.LOW)
+
+    def GetSupportsPortIo(self):
+        return True
+
+    def ReadGpioPort(self):
+        # RPi.GPIO has no port read so snapshot the configured inputs here,
+        # keeping the bus to a single call into the HAL
+        levels = 0
+        for pin in self._inputs:
+            if GPIO.input(pin) == GPIO.HIGH:
+                levels |= 1 << pin
+
+        return levels
+
+    def SetGpioMask(self, mask):
+        GPIO.output(self._maskToPins(mask), GPIO.HIGH)
+
+    def ClearGpioMask(self, mask):
+        GPIO.output(self._maskToPins(mask), GPIO.LOW)
+
+    def _maskToPins(self, mask):
+        pins = []
+        pin = 0
+        while mask:
+            if mask & 1:
+                pins.append(pin)
+            mask >>= 1
+            pin += 1
+
+        return pins
@@ -4,7 +4,7 @@ import os
 sys.path.insert(0, os.path.abspath('../lib'))
  
 from Hardware import InputBus, OutputBus
-from BusReader import BusReader
+from BusReader import BusReader, Traversal
 
 class MockOutputBus(OutputBus):
     def Reset(self):
@@ -13,6 +13,9 @@ class MockOutputBus(OutputBus):
     def Write(self, data):
         self.data = data
 
+    def Advance(self):
+        self.data = (self.data + 1) % 16
+
     def GetWidth(self):
         return 4
 
@@ -69,5 +72,19 @@ def main():
             data = reader.Read(1)
             print('0x{:04x}  0x{:02x}'.format(outBus.GetData(), data[0]))
 
+        print("seek past the end")
+        reader.Seek(-4, os.SEEK_END)
+        print(len(reader.Read(4)), reader.ReadInto(bytearray(4)))
+
+        print("gray code traversal")
+        reader.Reset()
+        reader.Seek(3)
+        linear = reader.Read(11)
+        reader.SetTraversal(Traversal.GRAY)
+        reader.Seek(3)
+        gray = reader.Read(11)
+        print("last address 0x{:04x}".format(outBus.GetData()))
+        print("matches linear", gray == linear, len(gray))
+
 if __name__ == "__main__":
     main() 
@@ -1,5 +1,6 @@
 import sys
 import os
+import time
 
 sys.path.insert(0, os.path.abspath('../lib'))
  
@@ -19,6 +20,33 @@ class MockBytesSink(BytesSink):
     def GetSize(self):
         return self._size
 
+class SlowBytesSink(BytesSink):
+    def __init__(self):
+        self.Reset()
+
+    def Reset(self):
+        self._data = bytearray()
+
+    def Write(self, data):
+        time.sleep(0.001)
+        self._data += data
+
+    def GetData(self):
+        return self._data
+
+class FailingBytesSink(BytesSink):
+    def __init__(self, failAfter):
+        self._failAfter = failAfter
+        self.Reset()
+
+    def Reset(self):
+        self._writes = 0
+
+    def Write(self, data):
+        self._writes += 1
+        if self._writes > self._failAfter:
+            raise IOError("sink failed")
+
 class MockBytesSource(BytesSource):
     def __init__(self, upperBound):
         self._upperBound = upperBound
@@ -88,5 +116,37 @@ def main():
     print("source.eof", source.eof)
     print("sink.size", sink.GetSize())
 
+def TestPipeline():
+    source = MockBytesSource(1024)
+    sink = SlowBytesSink()
+
+    with BytesReader(source, 16, pipelineDepth = 4) as reader:
+        reader.AddSink(sink)
+        data = reader.Read(1024)
+        reader.Flush()
+        print("pipelined in order", sink.GetData() == data)
+
+    source = MockBytesSource(1024)
+    reader = BytesReader(source, 16, pipelineDepth = 4)
+    reader.AddSink(FailingBytesSink(8))
+    try:
+        reader.Read(1024)
+        reader.Flush()
+        print("pipelined error lost")
+    except IOError as error:
+        print("pipelined error", error)
+    try:
+        reader.Flush()
+        print("pipelined error raised once only")
+    except IOError as error:
+        print("pipelined error again", error)
+
+    reader.Reset()
+    reader.Read(64)
+    reader.Flush()
+    print("pipelined sink fed again after reset")
+    reader.Dispose()
+
 if __name__ == "__main__":
-    main() 
+    main()
+    TestPipeline()
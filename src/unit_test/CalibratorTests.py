@@ -0,0 +1,70 @@
+import sys
+import os
+import random
+import tempfile
+
+sys.path.insert(0, os.path.abspath('../lib'))
+sys.path.insert(0, os.path.abspath('../mock'))
+
+from Gpio import InputGpioBus, OutputGpioBus, CounterBasedAddressBus
+from BusReader import BusReader
+from Calibrator import Calibrator
+from TimingProfileCache import TimingProfileCache
+from SimulatedPromGpio import SimulatedPromGpio
+
+DataPins = (17,27,22,18,2,3,23,24)
+PresetPins = (30,31,32,33,34,35,36,37,38,39)
+ResetPin = 15
+ClockPin = 14
+LoadPin = 4
+Width = 10
+
+def MakeReader(image, dataPins = DataPins):
+    # 150us access time and 50us minimum clock pulse, so roughly 10kHz tops
+    hal = SimulatedPromGpio(image, dataPins, resetPin=ResetPin, clockPin=ClockPin, counterWidth=Width,
+                            loadPin=LoadPin, presetPins=PresetPins, accessTime=150000, minPulseWidth=50000)
+    presetBus = OutputGpioBus(hal, PresetPins)
+    addressBus = CounterBasedAddressBus(hal, Width, 1000, ResetPin, ClockPin, LoadPin, presetBus)
+    dataBus = InputGpioBus(hal, dataPins)
+    return addressBus, BusReader(addressBus, dataBus)
+
+def TestCache(image):
+    path = os.path.join(tempfile.mkdtemp(), "timing.json")
+    cache = TimingProfileCache(path)
+
+    # Switching between two wirings keeps a profile for each
+    wirings = []
+    for dataPins in (DataPins, DataPins, DataPins[::-1], DataPins, DataPins[::-1]):
+        addressBus, reader = MakeReader(image, dataPins)
+        with reader:
+            calibrator = Calibrator(reader, 1 << Width, blockSize=32, sampleBlocks=4, maxErrorRate=0.2)
+            profile, cached = cache.Resolve("27C080", addressBus, reader, calibrator, 4000, 100000, 400000)
+            print("cached" if cached else "calibrated", profile)
+            wirings.append(TimingProfileCache.DescribeWiring(addressBus, reader.GetDataBus()))
+
+    reloaded = TimingProfileCache(path)
+    print("reloaded", reloaded.Get("27C080", wirings[0]), "and", reloaded.Get("27C080", wirings[2]))
+
+    reloaded.Invalidate("27C080", wirings[2])
+    print("invalidated one wiring, other kept", TimingProfileCache(path).Get("27C080", wirings[0]) != None)
+    print("invalidated wiring dropped", TimingProfileCache(path).Get("27C080", wirings[2]) == None)
+    os.remove(path)
+
+def main():
+    image = random.Random(Width).randbytes(1 << Width)
+    addressBus, reader = MakeReader(image)
+
+    with reader:
+        calibrator = Calibrator(reader, 1 << Width, blockSize=32, sampleBlocks=4, maxErrorRate=0.2)
+        print("sample offsets", [hex(offset) for offset in calibrator.GetSampleOffsets()])
+
+        result = calibrator.Calibrate(addressBus, reader, 4000, 100000, 400000)
+        print(result)
+
+        reader.Seek(0)
+        print("full read matches", reader.Read(1 << Width) == image)
+
+    TestCache(image)
+
+if __name__ == "__main__":
+    main()
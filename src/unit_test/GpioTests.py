@@ -1,15 +1,16 @@
 import sys
 import os
+import io
 
 sys.path.insert(0, os.path.abspath('../lib'))
 sys.path.insert(0, os.path.abspath('../mock'))
  
 from Gpio import Gpio, InputGpioBus, OutputGpioBus, CounterBasedAddressBus
 from MockGpio import MockGpio
+from InstrumentedGpio import InstrumentedGpio
 
-def main():
+def TestBuses(gpio):
     pins = [1, 4, 8, 9]
-    gpio = MockGpio()
 
     print("InputGpioBus")
     inputBus = InputGpioBus(gpio, pins)
@@ -28,6 +29,14 @@ def main():
     print("")
     outputBus.Write(15)
 
+def main():
+    print("Port I/O")
+    TestBuses(MockGpio())
+
+    print("Per-pin I/O")
+    gpio = MockGpio(portIo=False)
+    TestBuses(gpio)
+
     print("CounterBasedAddressBus")
     width = 4
     freq = 5 # 5hz
@@ -53,5 +62,23 @@ def main():
 
     print("reset")
     addressBus.Reset()
+
+    print("requested {} Hz, achieved {:.2f} Hz".format(addressBus.GetRequestedFrequency(), addressBus.GetAchievedFrequency()))
+
+    print("InstrumentedGpio")
+    with InstrumentedGpio(MockGpio(io.StringIO(), portIo=False)) as gpio:
+        addressBus = CounterBasedAddressBus(gpio, width, 0, resetPin, clockPin)
+        addressBus.Write(8)
+        addressBus.Write(4)
+        outputBus = OutputGpioBus(gpio, [16, 17, 18])
+        for value in range(0, 8):
+            outputBus.Write(value)
+
+    print("InstrumentedGpio port I/O")
+    with InstrumentedGpio(MockGpio(io.StringIO())) as gpio:
+        inputBus = InputGpioBus(gpio, [20, 21])
+        for i in range(0, 3):
+            inputBus.Read()
+        print("pin 20 reads", gpio.GetPinStatistics(20).reads)
 if __name__ == "__main__":
     main() 
@@ -0,0 +1,48 @@
+import sys
+import os
+import random
+import tempfile
+
+sys.path.insert(0, os.path.abspath('../lib'))
+
+from MerkleTree import MerkleTree, MerkleHasher
+
+BlockSize = 256
+
+def HashImage(image, writeSize):
+    hasher = MerkleHasher(BlockSize)
+    for offset in range(0, len(image), writeSize):
+        hasher.Write(memoryview(image)[offset:offset + writeSize])
+    return hasher
+
+def main():
+    image = bytearray(random.Random(0).randbytes(64 * 1024 + 100))
+    hasher = HashImage(image, 1000)
+    print(hasher)
+    print("blocks", hasher.GetTree().GetBlockCount())
+    print("write size independent", HashImage(image, 4096).GetDigest() == hasher.GetDigest())
+
+    path = os.path.join(tempfile.mkdtemp(), "image.pprm")
+    hasher.Save(path)
+    loaded = MerkleTree.Load(path)
+    print("manifest bytes", os.path.getsize(path))
+    print("reloaded root matches", loaded.GetRoot() == hasher.GetDigest())
+
+    other = bytearray(image)
+    for offset in (0x10, 0x4321, len(image) - 1):
+        other[offset] ^= 0x01
+    tree = HashImage(other, 1000).GetTree()
+    print("same", loaded.Diff(hasher.GetTree()))
+    for block in loaded.Diff(tree):
+        offset, length = tree.GetBlockRange(block)
+        print("differs block {} at 0x{:06x} +{}".format(block, offset, length))
+
+    try:
+        loaded.Diff(HashImage(image[:1000], 1000).GetTree())
+    except ValueError as error:
+        print("mismatched trees", error)
+
+    os.remove(path)
+
+if __name__ == "__main__":
+    main()
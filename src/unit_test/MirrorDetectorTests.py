@@ -0,0 +1,65 @@
+import sys
+import os
+import io
+import random
+import contextlib
+
+sys.path.insert(0, os.path.abspath('../lib'))
+sys.path.insert(0, os.path.abspath('../mock'))
+
+from Gpio import InputGpioBus, OutputGpioBus
+from BusReader import BusReader
+from BytesReader import BytesReader
+from MirrorDetector import MirrorDetector
+from PromReader import PromReader
+from HashGenerator import HashingCollective
+from SimulatedPromGpio import SimulatedPromGpio
+
+AddressPins = (10,9,11,25,8,7,5,6,12,13,19,16,20,21,26,4)
+DataPins = (17,27,22,18,2,3,23,24)
+UpperBound = 1 << len(AddressPins)
+
+def MakeReader(image):
+    hal = SimulatedPromGpio(image, DataPins, AddressPins)
+    return BusReader(OutputGpioBus(hal, AddressPins), InputGpioBus(hal, DataPins))
+
+def TestDetector(name, image):
+    detector = MirrorDetector(UpperBound)
+    with MakeReader(image) as source, BytesReader(source, 256) as reader:
+        reader.AddTerminator(detector)
+        read = 0
+        while not reader.eof:
+            read += len(reader.Read(1024))
+
+        print(name, "read", hex(read), "size", hex(detector.GetSize()) if detector.GetSize() else None,
+              "image matches", detector.GetImage() == image)
+
+def main():
+    rng = random.Random(0)
+    TestDetector("27C512", rng.randbytes(UpperBound))
+    TestDetector("27C128", rng.randbytes(UpperBound // 4))
+    TestDetector("2716", rng.randbytes(2048))
+
+    # A table stored twice near address 0 is not a mirror of the part
+    table = rng.randbytes(256)
+    TestDetector("repeated table 27C512", table * 2 + rng.randbytes(UpperBound - 512))
+
+    # Erased fill lining up with erased fill one candidate below must not
+    # confirm a mirror on its own
+    image = (b'\xff' * 4096 + rng.randbytes(4096)) * 2
+    image = image[:12288] + rng.randbytes(4096)
+    TestDetector("filled 27C128", image)
+
+    image = rng.randbytes(8192)
+    reference = HashingCollective()
+    reference.Write(image)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        with PromReader(MakeReader(image), mirrorDetector=MirrorDetector(UpperBound)) as reader:
+            reader.Read(0)
+    lines = output.getvalue().splitlines()
+    print(lines[-6])
+    print("PromReader hashes one copy", lines[-5:-1] == str(reference).splitlines())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import sys
+import os
+import time
+import tempfile
+
+sys.path.insert(0, os.path.abspath('../lib'))
+sys.path.insert(0, os.path.abspath('../pi'))
+
+from Gpio import InputGpioBus, OutputGpioBus
+from MmapGpio import MmapGpio
+
+def main():
+    AddressPins = (10,9,11,25,8,7,5,6,12,13,19,16,20,21,26)
+
+    path = os.path.join(tempfile.mkdtemp(), "gpio-registers")
+    MmapGpio.CreateRegisterFile(path)
+
+    with MmapGpio(path, emulateLevels=True) as gpio:
+        outputBus = OutputGpioBus(gpio, AddressPins)
+        # Read the address pins back through the emulated level registers
+        inputBus = InputGpioBus(gpio, AddressPins)
+
+        for address in (0x0000, 0x0001, 0x1234, 0x7fff, 0x4000):
+            outputBus.Write(address)
+            print('0x{:04x}  0x{:04x}  levels 0x{:08x}'.format(address, inputBus.Read(), gpio.ReadGpioPort()))
+
+    with MmapGpio(path) as gpio:
+        outputBus = OutputGpioBus(gpio, AddressPins)
+
+        count = outputBus.upperbound
+        start = time.perf_counter()
+        for address in range(0, count):
+            outputBus.Write(address)
+        elapsed = time.perf_counter() - start
+        print("{} address writes in {:.3f}s ({:.0f}/s)".format(count, elapsed, count / elapsed))
+
+    os.remove(path)
+
+if __name__ == "__main__":
+    main()
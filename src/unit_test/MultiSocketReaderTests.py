@@ -0,0 +1,49 @@
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath('../lib'))
+sys.path.insert(0, os.path.abspath('../mock'))
+
+from Gpio import InputGpioBus, CounterBasedAddressBus
+from MultiSocketReader import MultiSocketReader
+from HashGenerator import HashingCollective
+from SimulatedPromGpio import SimulatedPromGpio
+
+SocketPins = ((17,27,22,18,2,3,23,24), (40,41,42,43,44,45,46,47), (48,49,50,51,52,53,54,55))
+ResetPin = 15
+ClockPin = 14
+Width = 10
+
+def TestSockets(portIo):
+    images = [random.Random(seed).randbytes(1 << Width) for seed in range(0, len(SocketPins))]
+    hal = SimulatedPromGpio(images[0], SocketPins[0], resetPin=ResetPin, clockPin=ClockPin, counterWidth=Width, portIo=portIo)
+    for image, pins in zip(images[1:], SocketPins[1:]):
+        hal.AddSocket(image, pins)
+
+    dataBuses = [InputGpioBus(hal, pins) for pins in SocketPins]
+    with MultiSocketReader(CounterBasedAddressBus(hal, Width, 0, ResetPin, ClockPin), dataBuses) as reader:
+        print("port io", portIo, "sharing port", reader.GetIsSharingPort())
+
+        hal.ResetCallCount()
+        while not reader.eof:
+            reader.Read(100)
+        print("calls per address", hal.GetCallCount() / (1 << Width))
+
+        for socket in range(0, reader.GetSocketCount()):
+            reference = HashingCollective()
+            reference.Write(images[socket])
+            print("socket", socket, "image matches", reader.GetImage(socket) == images[socket],
+                  "hashes match", str(reader.GetHashes(socket)) == str(reference))
+
+        reader.Seek(0x100)
+        reader.Read(16)
+        print("re-read matches", all(reader.GetImage(socket)[0x100:0x110] == images[socket][0x100:0x110]
+                                     for socket in range(0, reader.GetSocketCount())))
+
+def main():
+    TestSockets(True)
+    TestSockets(False)
+
+if __name__ == "__main__":
+    main()
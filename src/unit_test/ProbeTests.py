@@ -0,0 +1,57 @@
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath('../lib'))
+sys.path.insert(0, os.path.abspath('../mock'))
+
+from Gpio import InputGpioBus, OutputGpioBus, CounterBasedAddressBus
+from BusReader import BusReader
+from Probe import Probe, SocketState, PlanAction
+from SimulatedPromGpio import SimulatedPromGpio
+
+AddressPins = (10,9,11,25,8,7,5,6,12,13,19,16,20,21,26,4)
+DataPins = (17,27,22,18,2,3,23,24)
+ResetPin = 15
+ClockPin = 14
+CounterWidth = 20
+
+def ProbeGpio(name, image, **kwargs):
+    hal = SimulatedPromGpio(image, DataPins, AddressPins, **kwargs)
+    with BusReader(OutputGpioBus(hal, AddressPins), InputGpioBus(hal, DataPins)) as reader:
+        hal.ResetCallCount()
+        result = Probe(reader).Run()
+        print(name, "calls", hal.GetCallCount())
+        print(result)
+        return result
+
+def ProbeCounter(name, image, maxCalls):
+    hal = SimulatedPromGpio(image, DataPins, resetPin=ResetPin, clockPin=ClockPin, counterWidth=CounterWidth)
+    with BusReader(CounterBasedAddressBus(hal, CounterWidth, 0, ResetPin, ClockPin), InputGpioBus(hal, DataPins)) as reader:
+        hal.ResetCallCount()
+        result = Probe(reader).Run()
+        calls = hal.GetCallCount()
+        print(name, "calls", calls, "within budget" if calls <= maxCalls else "OVER BUDGET")
+        print(result)
+
+def main():
+    rng = random.Random(0)
+    result = ProbeGpio("27C512", rng.randbytes(1 << 16))
+    assert result.stuck == 0
+    ProbeGpio("2716", rng.randbytes(2048))
+    ProbeGpio("erased", b'\xff' * 2048)
+    ProbeGpio("empty", None)
+    # Stuck bits are flagged while the part is still read
+    result = ProbeGpio("stuck", rng.randbytes(8192), stuckHigh=0x04, stuckLow=0x80)
+    assert result.state == SocketState.OK and result.plan.action == PlanAction.READ and result.stuck == 0x84
+    result = ProbeGpio("stuck and floating", None, stuckHigh=0x0F)
+    assert result.state == SocketState.STUCK and result.plan.action == PlanAction.STOP
+    ProbeGpio("ascii 27C512", bytes(rng.randrange(0x20, 0x7F) for i in range(0, 1 << 16)))
+    ProbeGpio("starts with fill", b'\xff' * 256 + rng.randbytes(8192 - 256))
+    ProbeCounter("2716 on a 20 bit counter", rng.randbytes(2048), 10000)
+    ProbeCounter("empty socket on a 20 bit counter", None, 1000)
+    ProbeCounter("erased 2716 on a 20 bit counter", b'\xff' * 2048, 20000)
+    ProbeCounter("27C512 on a 20 bit counter", rng.randbytes(1 << 16), 20000)
+
+if __name__ == "__main__":
+    main()
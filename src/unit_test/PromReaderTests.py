@@ -1,9 +1,13 @@
 import sys
 import os
+import io
+import tempfile
+import contextlib
 
 sys.path.insert(0, os.path.abspath('../lib'))
 
 from PromReader import PromReader
+from CheckpointJournal import CheckpointJournal
 from BytesReader import BytesSink, BytesSource, BytesReader
 from Ux import ProgressReporter
 
@@ -23,6 +27,7 @@ class MockBytesSource(BytesSource):
             self._offset += offset
         elif whence == os.SEEK_END:
             self._offset = self._upperBound - offset
+        self._eof = self._offset >= self._upperBound
 
     def Read(self, size):
         data = bytearray()
@@ -42,6 +47,99 @@ class MockBytesSource(BytesSource):
     def GetIsEOF(self):
         return self._eof
 
+class InterruptingBytesSource(MockBytesSource):
+    def __init__(self, upperBound, failAt):
+        self._failAt = failAt
+        super().__init__(upperBound)
+
+    def Read(self, size):
+        if self._offset + size > self._failAt:
+            raise IOError("brownout")
+        return super().Read(size)
+
+class FlakyBytesSource(MockBytesSource):
+    # Corrupts one byte the first time it is read
+    def __init__(self, upperBound, flakyOffset):
+        self._flakyOffset = flakyOffset
+        super().__init__(upperBound)
+
+    def Read(self, size):
+        offset = self._offset
+        data = super().Read(size)
+        if self._flakyOffset != None and offset <= self._flakyOffset < offset + len(data):
+            data[self._flakyOffset - offset] ^= 0xFF
+            self._flakyOffset = None
+        return data
+
+def WriteImage(size, patches = ()):
+    image = bytearray(i % 256 for i in range(0, size))
+    for offset in patches:
+        image[offset] ^= 0x55
+
+    path = os.path.join(tempfile.mkdtemp(), "golden.bin")
+    with open(path, "wb") as file:
+        file.write(image)
+    return path
+
+def TestVerify():
+    size = 8192
+    with PromReader(MockBytesSource(size)) as reader:
+        print(reader.Verify(WriteImage(size)), end="")
+        print(reader.Verify(WriteImage(size, (0x0C00,)), mismatchBudget = 1), end="")
+        print(reader.Verify(WriteImage(size, (0x0400, 0x1800)), mismatchBudget = 1), end="")
+
+    with PromReader(FlakyBytesSource(size, 0x1234)) as reader:
+        print(reader.Verify(WriteImage(size), mismatchBudget = 2), end="")
+
+    # Verify leaves the chip at 0 whether it passes or aborts, so a read
+    # after it covers the whole part
+    expected = ReadHashes(MockBytesSource(size))
+    for patches in ((), (0x0400, 0x1800)):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            with PromReader(MockBytesSource(size)) as reader:
+                reader.Verify(WriteImage(size, patches))
+                reader.Read(0)
+        print("read after verify matches", output.getvalue().splitlines()[-5:] == expected)
+
+def ReadHashes(source, journal = None, pipelineDepth = 0):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        with PromReader(source, journal, pipelineDepth=pipelineDepth) as reader:
+            reader.Read(0)
+
+    return output.getvalue().splitlines()[-5:]
+
+def TestJournal():
+    size = 8192
+    expected = ReadHashes(MockBytesSource(size))
+
+    path = os.path.join(tempfile.mkdtemp(), "image.bin")
+    journal = CheckpointJournal(path, "test", interval = 1024)
+    try:
+        ReadHashes(InterruptingBytesSource(size, 5000), journal, pipelineDepth=16)
+    except IOError as error:
+        print("interrupted", error)
+    journal.Close()
+
+    journal = CheckpointJournal(path, "test", interval = 1024)
+    print("resume from", journal.GetPosition())
+    print("resumed hashes match", ReadHashes(MockBytesSource(size), journal) == expected)
+    journal.Close()
+
+    with open(path, "rb") as file:
+        print("image matches", file.read() == bytes(i % 256 for i in range(0, size)))
+
+    journal = CheckpointJournal(path, "other")
+    print("other part resumes from", journal.GetPosition())
+    journal.Close()
+
+    try:
+        CheckpointJournal(path, None)
+        print("journal without identity accepted")
+    except ValueError as error:
+        print("journal without identity refused:", error)
+
 def main():
     source = MockBytesSource(256)
 
@@ -51,4 +149,6 @@ def main():
         reader.Read(48)
 
 if __name__ == "__main__":
-    main() 
+    main()
+    TestJournal()
+    TestVerify() 
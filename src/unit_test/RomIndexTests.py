@@ -0,0 +1,110 @@
+import sys
+import os
+import random
+import io
+import tempfile
+import binascii
+import contextlib
+
+sys.path.insert(0, os.path.abspath('../lib'))
+
+from RomIndex import RomIndex
+from PromReader import PromReader
+from BytesReader import BytesSource
+
+Size = 4096
+
+Dat = """<?xml version="1.0"?>
+<datafile>
+    <game name="alpha">
+        <rom name="alpha.u1" size="{size}" crc="{alpha:08x}"/>
+    </game>
+    <game name="beta">
+        <rom name="beta.u1" size="{size}" crc="{beta:08x}"/>
+        <rom name="beta.u2" size="{size}" crc="deadbeef"/>
+    </game>
+</datafile>
+"""
+
+class ImageBytesSource(BytesSource):
+    def __init__(self, image):
+        self._image = bytearray(image)
+        self.Reset()
+
+    def Reset(self):
+        self._offset = 0
+
+    def Seek(self, offset, whence = os.SEEK_SET):
+        self._offset = offset
+
+    def Read(self, size):
+        data = self._image[self._offset:self._offset + size]
+        self._offset += len(data)
+        return data
+
+    def GetIsEOF(self):
+        return self._offset >= len(self._image)
+
+def MakeImages():
+    # Two programs sharing a common header, the rest of each part erased
+    rng = random.Random(Size)
+    header = rng.randbytes(256)
+    images = {}
+    for name in ("alpha", "beta"):
+        images[name] = header + rng.randbytes(1024) + b'\xff' * (Size - 1280)
+    images["gamma"] = rng.randbytes(Size)
+    return images
+
+def main():
+    directory = tempfile.mkdtemp()
+    images = MakeImages()
+    paths = {}
+    for name, image in images.items():
+        paths[name] = os.path.join(directory, name + ".bin")
+        with open(paths[name], "wb") as file:
+            file.write(image)
+
+    datPath = os.path.join(directory, "test.dat")
+    with open(datPath, "w") as file:
+        file.write(Dat.format(size=Size, alpha=binascii.crc32(images["alpha"]), beta=binascii.crc32(images["beta"])))
+
+    index = RomIndex()
+    index.AddDat(datPath)
+    for name in ("alpha", "beta", "gamma"):
+        index.AddImage(paths[name])
+    index.Build(sampleCount=16)
+
+    addresses = index.GetAddresses(Size)
+    print("samples", len(addresses), "in shared header", sum(1 for address in addresses if address < 256))
+
+    indexPath = os.path.join(directory, "index.json")
+    index.Save(indexPath)
+    index = RomIndex(indexPath)
+
+    for name in ("alpha", "beta", "gamma"):
+        source = ImageBytesSource(images[name])
+        candidates = index.Identify(Size, index.Sample(source, Size))
+        print(name, "->", [str(candidate.entry) for candidate in candidates])
+
+    flaky = bytearray(images["beta"])
+    flaky[addresses[3]] ^= 0x10
+    with PromReader(ImageBytesSource(flaky)) as reader:
+        print("exact", len(reader.Identify(index)))
+        candidates = reader.Identify(index, maxMismatches=2)
+        print("flaky ->", candidates[0])
+        print(reader.Verify(candidates[0].entry.path, mismatchBudget=4), end="")
+
+    # Identify leaves the chip at 0, so a read after it covers the whole part
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        with PromReader(ImageBytesSource(images["gamma"])) as reader:
+            reader.Identify(index)
+            reader.Read(0)
+    print("read after identify matches", f'crc32: {binascii.crc32(images["gamma"]):#010x}' in output.getvalue())
+
+    unknown = ImageBytesSource(random.Random(1).randbytes(Size))
+    print("unknown ->", len(index.Identify(Size, index.Sample(unknown, Size), maxMismatches=2)))
+    print("dat only", [str(entry) for entry in index.Match(Size, 0xdeadbeef)])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath('../lib'))
+sys.path.insert(0, os.path.abspath('../mock'))
+
+from SeekPlanner import SeekPlanner
+from Gpio import InputGpioBus, OutputGpioBus, CounterBasedAddressBus, UpDownCounterAddressBus
+from SimulatedPromGpio import SimulatedPromGpio
+
+DataPins = (17,27,22,18,2,3,23,24)
+PresetPins = (30,31,32,33,34,35,36,37,38,39,40,41)
+ResetPin = 15
+ClockPin = 14
+LoadPin = 4
+DirectionPin = 3
+Width = 12
+
+def main():
+    print("plans, no load")
+    planner = SeekPlanner(Width)
+    for current, target in ((0, 0), (16, 32), (32, 16), (4090, 4), (4095, 2), (4000, 100)):
+        print('0x{:03x} -> {}'.format(current, planner.Plan(current, target)))
+
+    print("order")
+    targets = [0x800, 0x010, 0xff0, 0x400, 0x010]
+    for current in (0, 0x500, 0xf00):
+        order = planner.Order(current, targets)
+        print('0x{:03x}: {} cost {}'.format(current, [hex(t) for t in order], planner.GetCost(current, order)))
+
+    print("counter bus with load")
+    image = random.Random(Width).randbytes(1 << Width)
+    hal = SimulatedPromGpio(image, DataPins, resetPin=ResetPin, clockPin=ClockPin, counterWidth=Width,
+                            loadPin=LoadPin, presetPins=PresetPins)
+    presetBus = OutputGpioBus(hal, PresetPins)
+    addressBus = CounterBasedAddressBus(hal, Width, 0, ResetPin, ClockPin, LoadPin, presetBus)
+    dataBus = InputGpioBus(hal, DataPins)
+
+    for target in addressBus.OrderSeeks([5, 6, 3000, 2999, 100, 4095, 0]):
+        cost = addressBus.GetWriteCost(target)
+        hal.ResetCallCount()
+        addressBus.Write(target)
+        valid = hal.GetAddress() == target and dataBus.Read() == image[target]
+        print('0x{:03x} estimated {} actual {} {}'.format(target, cost, hal.GetCallCount() - 1, "ok" if valid else "MISMATCH"))
+
+    print("up/down counter bus")
+    hal = SimulatedPromGpio(image, DataPins, resetPin=ResetPin, clockPin=ClockPin, counterWidth=Width, directionPin=DirectionPin)
+    addressBus = UpDownCounterAddressBus(hal, Width, 0, ResetPin, ClockPin, DirectionPin)
+    dataBus = InputGpioBus(hal, DataPins)
+
+    # Runs of backward moves keep counting down, forward moves after them
+    # switch back up
+    for target in (0x800, 0x7f0, 0x7e0, 0x7ff, 0x010, 0xff0, 0x020, 0x010, 0x030):
+        cost = addressBus.GetWriteCost(target)
+        hal.ResetCallCount()
+        addressBus.Write(target)
+        actual = hal.GetCallCount()
+        valid = hal.GetAddress() == target and dataBus.Read() == image[target]
+        print('0x{:03x} estimated {} actual {} {}'.format(target, cost, actual, "ok" if valid else "MISMATCH"))
+        assert cost == actual
+
+if __name__ == "__main__":
+    main()